@@ -1,18 +1,30 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import hashlib
+import json
 import os
+import re
 import shutil
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
+import yaml
 
 from zoo_index.config import load_rules
 from zoo_index.data_sources.tushare import TushareClient
-from zoo_index.index import build_constituents, compute_equal_weight_return, prepare_universe_asof
+from zoo_index.index import (
+    build_constituents,
+    compute_equal_weight_returns_batch,
+    compute_equal_weight_returns_shared,
+    prepare_universe_asof,
+)
 from zoo_index.outputs import (
     compute_changes,
     compute_suspected_noise,
@@ -21,12 +33,19 @@ from zoo_index.outputs import (
     generate_index_html,
     generate_latest_json,
     load_nav,
+    load_snapshot,
     save_constituents,
     save_changes,
     save_holdings,
     update_nav,
 )
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_SHANGHAI = ZoneInfo("Asia/Shanghai")
+
+_SNAPSHOT_DATE_MATCH = re.compile(r"\d{8}").fullmatch
+
 DEFAULT_BACKFILL_YEARS = 5
 DEFAULT_COMPLETE_LOOKBACK = 10
 DEFAULT_BENCHMARK_CODE = "510300.SH"
@@ -99,7 +118,7 @@ def _parse_args() -> argparse.Namespace:
 
 
 def _current_shanghai_date() -> str:
-    return datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%Y%m%d")
+    return datetime.now(_SHANGHAI).strftime("%Y%m%d")
 
 
 def _print_recent_complete_date_error(end_date: str, exc: Exception) -> None:
@@ -127,11 +146,26 @@ def _get_open_dates_in_range(
     client: TushareClient, start_date: str, end_date: str
 ) -> list[str]:
     df = client.get_trade_calendar_range(start_date, end_date)
-    open_days = df[df["is_open"] == 1].copy()
-    if open_days.empty:
-        return []
-    open_days["cal_date"] = open_days["cal_date"].astype(str)
-    return open_days.sort_values("cal_date")["cal_date"].tolist()
+    # One numpy pass over the raw column; no DataFrame copy or sort_values.
+    mask = df["is_open"].to_numpy() == 1
+    dates = df["cal_date"].to_numpy()[mask].astype("U8")
+    dates.sort()
+    return dates.tolist()
+
+
+def _rows_for_code(df: pd.DataFrame, code: str) -> pd.DataFrame:
+    # Equality on the raw numpy column plus iloc over the hit positions
+    # skips pandas' boolean-mask alignment/copy machinery for what is a
+    # single-row extraction from ~5000 rows.
+    mask = df["ts_code"].to_numpy() == code
+    return df.iloc[np.flatnonzero(mask)]
+
+
+def _benchmark_close_pre_close(df: pd.DataFrame) -> tuple[float, float]:
+    # Single-row benchmark quote: one to_numpy call instead of iloc/pd.isna
+    # scalar dispatch.
+    arr = df[["close", "pre_close"]].to_numpy(dtype="float64")[0]
+    return float(arr[0]), float(arr[1])
 
 
 def _is_benchmark_data_ready(
@@ -142,36 +176,41 @@ def _is_benchmark_data_ready(
 ) -> bool:
     if benchmark.source == "index":
         df = client.get_index_daily(trade_date, benchmark.code)
-        if df.empty:
-            return False
-        row = df.iloc[0]
     elif benchmark.source == "fund":
         df = client.get_fund_daily(trade_date, benchmark.code)
-        if df.empty:
-            return False
-        row = df.iloc[0]
     elif benchmark.source == "stock":
         if daily_prices is None:
             daily_prices = client.get_daily(trade_date)
-        row_slice = daily_prices[daily_prices["ts_code"] == benchmark.code]
-        if row_slice.empty:
-            return False
-        row = row_slice.iloc[0]
+        df = _rows_for_code(daily_prices, benchmark.code)
     else:
         raise ValueError(f"unknown benchmark source: {benchmark.source}")
 
-    if pd.isna(row["pre_close"]) or float(row["pre_close"]) <= 0:
+    if df.empty:
         return False
-    return True
+    _, pre_close = _benchmark_close_pre_close(df)
+    return bool(np.isfinite(pre_close)) and pre_close > 0
 
 
 def _is_trade_data_ready(
     client: TushareClient, trade_date: str, benchmark: BenchmarkConfig
 ) -> bool:
-    daily = client.get_daily(trade_date)
-    if daily.empty:
-        return False
-    return _is_benchmark_data_ready(client, trade_date, benchmark, daily)
+    # The benchmark quote is the decisive signal: Tushare publishes the
+    # whole-market daily table no later than the index/fund close data, so
+    # a single-row probe suffices even for the stock source — if the
+    # benchmark stock's row exists, the daily table has been published.
+    if benchmark.source == "stock":
+        row = client.get_daily_row(trade_date, benchmark.code)
+        if row.empty:
+            return False
+        _, pre_close = _benchmark_close_pre_close(row)
+        return bool(np.isfinite(pre_close)) and pre_close > 0
+    return _is_benchmark_data_ready(client, trade_date, benchmark)
+
+
+# Process-scoped memo for _resolve_recent_complete_date: the answer for a
+# given client/end date pair cannot change within one run, and failures are
+# never cached so a retry re-probes.
+_RECENT_COMPLETE_MEMO: dict[tuple[int, str, str, int], str] = {}
 
 
 def _resolve_recent_complete_date(
@@ -180,9 +219,31 @@ def _resolve_recent_complete_date(
     benchmark: BenchmarkConfig,
     lookback_open_days: int = DEFAULT_COMPLETE_LOOKBACK,
 ) -> str:
+    memo_key = (id(client), end_date, benchmark.code, lookback_open_days)
+    if memo_key in _RECENT_COMPLETE_MEMO:
+        return _RECENT_COMPLETE_MEMO[memo_key]
     open_dates = client.get_recent_open_dates(end_date, lookback_open_days)
-    for trade_date in reversed(open_dates):
+    if not open_dates:
+        raise ValueError("no complete trading day found")
+    # One HS300 range probe narrows the candidate list before any per-day
+    # probing: the latest date with a valid index quote is almost always
+    # the latest complete day, so the loop below usually verifies only it.
+    candidates = list(reversed(open_dates))
+    try:
+        probe = client.get_index_daily_range(
+            open_dates[0], open_dates[-1], DEFAULT_INDEX_BENCHMARK_CODE
+        )
+    except Exception:
+        probe = pd.DataFrame()
+    if not probe.empty:
+        pre_close = pd.to_numeric(probe["pre_close"], errors="coerce")
+        ready = probe.loc[pre_close > 0, "trade_date"].astype(str)
+        if not ready.empty:
+            best = ready.max()
+            candidates = [date for date in candidates if date <= best]
+    for trade_date in candidates:
         if _is_trade_data_ready(client, trade_date, benchmark):
+            _RECENT_COMPLETE_MEMO[memo_key] = trade_date
             return trade_date
     raise ValueError("no complete trading day found")
 
@@ -220,17 +281,17 @@ def _get_benchmark_return(
         df = client.get_index_daily(trade_date, benchmark.code)
         if df.empty:
             raise ValueError("基准行情为空")
-        row = df.iloc[0]
-        if pd.isna(row["pre_close"]) or float(row["pre_close"]) <= 0:
+        close, pre_close = _benchmark_close_pre_close(df)
+        if not np.isfinite(pre_close) or pre_close <= 0:
             raise ValueError("基准前收异常")
-        return float(row["close"] / row["pre_close"] - 1)
+        return close / pre_close - 1.0
 
     if benchmark.source == "fund":
         df = client.get_fund_daily(trade_date, benchmark.code)
         if df.empty:
             raise ValueError("基准行情为空")
-        row = df.iloc[0]
-        if pd.isna(row["pre_close"]) or float(row["pre_close"]) <= 0:
+        close, pre_close = _benchmark_close_pre_close(df)
+        if not np.isfinite(pre_close) or pre_close <= 0:
             raise ValueError("基准前收异常")
         adj_today = client.get_fund_adj(trade_date, benchmark.code)
         adj_prev = client.get_fund_adj(prev_date, benchmark.code)
@@ -241,8 +302,8 @@ def _get_benchmark_return(
         if pd.isna(adj_today_value) or pd.isna(adj_prev_value):
             raise ValueError("基准复权因子缺失")
         return _compute_adjusted_return(
-            float(row["close"]),
-            float(row["pre_close"]),
+            close,
+            pre_close,
             float(adj_today_value),
             float(adj_prev_value),
         )
@@ -250,18 +311,18 @@ def _get_benchmark_return(
     if benchmark.source == "stock":
         if daily_prices is None:
             daily_prices = client.get_daily(trade_date)
-        row_slice = daily_prices[daily_prices["ts_code"] == benchmark.code]
+        row_slice = _rows_for_code(daily_prices, benchmark.code)
         if row_slice.empty:
             raise ValueError("基准行情为空")
-        row = row_slice.iloc[0]
-        if pd.isna(row["pre_close"]) or float(row["pre_close"]) <= 0:
+        close, pre_close = _benchmark_close_pre_close(row_slice)
+        if not np.isfinite(pre_close) or pre_close <= 0:
             raise ValueError("基准前收异常")
         if adj_factors is None:
             adj_factors = client.get_adj_factor(trade_date)
         if prev_adj_factors is None:
             prev_adj_factors = client.get_adj_factor(prev_date)
-        adj_today = adj_factors[adj_factors["ts_code"] == benchmark.code]
-        adj_prev = prev_adj_factors[prev_adj_factors["ts_code"] == benchmark.code]
+        adj_today = _rows_for_code(adj_factors, benchmark.code)
+        adj_prev = _rows_for_code(prev_adj_factors, benchmark.code)
         if adj_today.empty or adj_prev.empty:
             raise ValueError("基准复权因子缺失")
         adj_today_value = adj_today.iloc[0]["adj_factor"]
@@ -269,8 +330,8 @@ def _get_benchmark_return(
         if pd.isna(adj_today_value) or pd.isna(adj_prev_value):
             raise ValueError("基准复权因子缺失")
         return _compute_adjusted_return(
-            float(row["close"]),
-            float(row["pre_close"]),
+            close,
+            pre_close,
             float(adj_today_value),
             float(adj_prev_value),
         )
@@ -279,32 +340,89 @@ def _get_benchmark_return(
 
 
 def _ensure_dirs(*paths: Path) -> None:
-    for path in paths:
+    # Deepest paths first: creating a child with parents=True also creates
+    # its ancestors, so overlapping parents cost no extra mkdir calls.
+    for path in sorted(set(paths), key=lambda item: len(item.parts), reverse=True):
         path.mkdir(parents=True, exist_ok=True)
 
 
 def _snapshot_rules(
     rules_path: Path, data_dir: Path, start_date: str, end_date: str
 ) -> Path:
-    timestamp = datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%Y%m%d%H%M%S")
+    timestamp = datetime.now(_SHANGHAI).strftime("%Y%m%d%H%M%S")
     snapshot_path = data_dir / f"rules_snapshot_{start_date}_{end_date}_{timestamp}.yml"
     shutil.copy2(rules_path, snapshot_path)
     return snapshot_path
 
 
+def _snapshot_index_path(data_dir: Path, prefix: str) -> Path:
+    return data_dir / f"_{prefix}_index.txt"
+
+
+def _append_snapshot_index(data_dir: Path, prefix: str, date: str) -> None:
+    # The index is a lookup hint only; _find_previous_snapshot always
+    # verifies against the directory. A failed append is still worth a
+    # loud signal because it means the hint will keep diverging.
+    try:
+        with _snapshot_index_path(data_dir, prefix).open("a", encoding="utf-8") as handle:
+            handle.write(date + "\n")
+    except OSError as exc:
+        print(f"快照索引写入失败（{prefix}）：{exc}")
+
+
+def _load_snapshot_index(data_dir: Path, prefix: str) -> list[str]:
+    path = _snapshot_index_path(data_dir, prefix)
+    if not path.exists():
+        return []
+    lines = {line.strip() for line in path.read_text(encoding="utf-8").splitlines()}
+    return sorted(value for value in lines if _SNAPSHOT_DATE_MATCH(value))
+
+
 def _find_previous_snapshot(data_dir: Path, prefix: str, date: str) -> Path | None:
-    candidates: list[tuple[str, Path]] = []
     prefix_value = f"{prefix}_"
-    for path in data_dir.glob(f"{prefix}_*.csv"):
-        stem = path.stem
-        if not stem.startswith(prefix_value):
-            continue
-        file_date = stem[len(prefix_value) :]
-        if file_date.isdigit() and file_date < date:
-            candidates.append((file_date, path))
-    if not candidates:
+    # Historical snapshots may still be CSV; new ones are Parquet and win
+    # ties on the same date. One os.scandir pass over plain names keeps the
+    # lookup free of per-entry Path allocations; the Path is built once at
+    # the end for the winner.
+    best_key = ("", -1)
+    best_name = ""
+    try:
+        entries = os.scandir(data_dir)
+    except FileNotFoundError:
         return None
-    return max(candidates, key=lambda item: item[0])[1]
+    with entries:
+        for entry in entries:
+            name = entry.name
+            if not name.startswith(prefix_value):
+                continue
+            if name.endswith(".parquet"):
+                file_date = name[len(prefix_value) : -len(".parquet")]
+                priority = 1
+            elif name.endswith(".csv"):
+                file_date = name[len(prefix_value) : -len(".csv")]
+                priority = 0
+            else:
+                continue
+            if _SNAPSHOT_DATE_MATCH(file_date) is None or file_date >= date:
+                continue
+            key = (file_date, priority)
+            if key > best_key:
+                best_key = key
+                best_name = name
+    if not best_name:
+        return None
+    # Cross-check the index hint: its append is best-effort and snapshots
+    # can land in data_dir without going through it, so the scan above is
+    # the source of truth. Divergence means an append was lost — say so
+    # and heal the index for future runs.
+    index_dates = _load_snapshot_index(data_dir, prefix)
+    if index_dates:
+        idx = bisect.bisect_left(index_dates, date) - 1
+        index_date = index_dates[idx] if idx >= 0 else ""
+        if index_date != best_key[0]:
+            print(f"快照索引与目录不一致（{prefix}），以目录为准。")
+            _append_snapshot_index(data_dir, prefix, best_key[0])
+    return Path(data_dir, best_name)
 
 
 def _month_first_open_date(
@@ -315,37 +433,205 @@ def _month_first_open_date(
         return cache[month_key]
     start_date = f"{month_key}01"
     df = client.get_trade_calendar_range(start_date, date)
-    open_days = df[df["is_open"] == 1].copy()
-    if open_days.empty:
+    mask = df["is_open"].to_numpy() == 1
+    dates = df["cal_date"].to_numpy()[mask].astype("U8")
+    if dates.size == 0:
         raise ValueError("no open trading day found")
-    open_days["cal_date"] = open_days["cal_date"].astype(str)
-    first_date = open_days.sort_values("cal_date").iloc[0]["cal_date"]
+    first_date = str(dates.min())
     cache[month_key] = first_date
     return first_date
 
 
+def _month_cache_path(cache_dir: Path) -> Path:
+    return cache_dir / "month_first_open.json"
+
+
+def _load_month_cache(cache_dir: Path | None) -> dict[str, str]:
+    # The {YYYYMM: YYYYMMDD} map never changes once a month has opened, so
+    # it is shared across runs via a tiny JSON file.
+    if cache_dir is None:
+        return {}
+    try:
+        data = json.loads(_month_cache_path(cache_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        str(key): str(value)
+        for key, value in data.items()
+        if _SNAPSHOT_DATE_MATCH(str(value)) and str(value)[:6] == str(key)
+    }
+
+
+def _save_month_cache(cache_dir: Path | None, cache: dict[str, str]) -> None:
+    if cache_dir is None or not cache:
+        return
+    path = _month_cache_path(cache_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(cache, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+def _precompute_month_first(
+    client: TushareClient, start_date: str, end_date: str
+) -> dict[str, str]:
+    """Derive every month's first open day from one calendar-range call."""
+    df = client.get_trade_calendar_range(f"{start_date[:6]}01", end_date)
+    open_days = df[df["is_open"] == 1]
+    if open_days.empty:
+        return {}
+    dates = open_days["cal_date"].astype(str)
+    return dates.groupby(dates.str[:6]).min().to_dict()
+
+
+def _rules_hash(rules) -> str:
+    # Stable digest of the effective rules; baked into cache filenames so a
+    # rules edit invalidates persisted constituents automatically.
+    payload = yaml.safe_dump(asdict(rules), allow_unicode=True, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:8]
+
+
 def _get_constituents_for_rebalance(
     cache: dict[str, tuple[pd.DataFrame, pd.DataFrame]],
     stock_basic: pd.DataFrame,
     namechange: pd.DataFrame,
     rules,
     rebalance_date: str,
+    cache_dir: Path | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     if rebalance_date in cache:
         return cache[rebalance_date]
+
+    disk_path = None
+    if cache_dir is not None:
+        disk_path = cache_dir / f"constituents_{rebalance_date}_{_rules_hash(rules)}.parquet"
+        if disk_path.exists():
+            combined = pd.read_parquet(disk_path)
+            strict_df = (
+                combined[combined["variant"] == "strict"]
+                .drop(columns=["variant"])
+                .reset_index(drop=True)
+            )
+            extended_df = (
+                combined[combined["variant"] == "extended"]
+                .drop(columns=["variant"])
+                .reset_index(drop=True)
+            )
+            if not strict_df.empty and not extended_df.empty:
+                cache[rebalance_date] = (strict_df, extended_df)
+                return cache[rebalance_date]
+
     universe = prepare_universe_asof(stock_basic, namechange, rebalance_date, rules)
     strict_df, extended_df = build_constituents(universe, rules)
     if strict_df.empty or extended_df.empty:
         raise ValueError("constituents is empty")
+
+    if disk_path is not None:
+        try:
+            strict = strict_df.copy()
+            strict["variant"] = "strict"
+            extended = extended_df.copy()
+            extended["variant"] = "extended"
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            pd.concat([strict, extended], ignore_index=True).to_parquet(
+                disk_path, engine="pyarrow", compression="snappy", index=False
+            )
+        except OSError:
+            pass
+
     cache[rebalance_date] = (strict_df, extended_df)
     return cache[rebalance_date]
 
 
-def _build_nav_from_returns(ret_df: pd.DataFrame) -> pd.DataFrame:
+def _prime_benchmark_range(
+    client: TushareClient, benchmark: BenchmarkConfig, start_date: str, end_date: str
+) -> None:
+    # One range call per endpoint replaces a per-day round trip for each
+    # trading day; the stock source already rides the bulk daily/adj fetches.
+    if benchmark.source == "index":
+        client.prime_index_daily(start_date, end_date, benchmark.code)
+    elif benchmark.source == "fund":
+        client.prime_fund_daily(start_date, end_date, benchmark.code)
+        client.prime_fund_adj(start_date, end_date, benchmark.code)
+
+
+def _precompute_benchmark_returns(
+    client: TushareClient, benchmark: BenchmarkConfig, start_date: str, end_date: str
+) -> dict[str, float]:
+    """Compute benchmark daily returns for a span with vectorized pandas ops.
+
+    Returns an empty dict for sources without a range endpoint (stock), and
+    omits dates with unusable data so callers fall back to the per-day path.
+    """
+    if benchmark.source == "index":
+        df = client.get_index_daily_range(start_date, end_date, benchmark.code)
+        if df.empty:
+            return {}
+        pre_close = pd.to_numeric(df["pre_close"], errors="coerce")
+        valid = df[pre_close > 0]
+        rets = valid["close"] / valid["pre_close"] - 1
+        return dict(zip(valid["trade_date"].astype(str), rets.astype(float)))
+
+    if benchmark.source == "fund":
+        daily = client.get_fund_daily_range(start_date, end_date, benchmark.code)
+        adj = client.get_fund_adj_range(start_date, end_date, benchmark.code)
+        if daily.empty or adj.empty:
+            return {}
+        merged = daily.merge(adj[["trade_date", "adj_factor"]], on="trade_date", how="inner")
+        merged = merged.sort_values("trade_date")
+        merged["adj_factor"] = pd.to_numeric(merged["adj_factor"], errors="coerce")
+        # The previous factor comes from the fund's own prior traded day,
+        # which matches the per-day lookup whenever the fund trades every
+        # open day (the normal ETF case).
+        merged["prev_adj_factor"] = merged["adj_factor"].shift(1)
+        merged["pre_close"] = pd.to_numeric(merged["pre_close"], errors="coerce")
+        valid = merged[
+            (merged["pre_close"] > 0)
+            & (merged["adj_factor"] > 0)
+            & (merged["prev_adj_factor"] > 0)
+        ]
+        rets = valid["close"] / valid["pre_close"] * (
+            valid["adj_factor"] / valid["prev_adj_factor"]
+        ) - 1
+        return dict(zip(valid["trade_date"].astype(str), rets.astype(float)))
+
+    return {}
+
+
+def _categorize_for_changes(df: pd.DataFrame) -> pd.DataFrame:
+    # Category dtype hashes int codes instead of Python strings, which
+    # speeds up the set diffs inside compute_changes.
+    if df.empty:
+        return df
+    converted = df.copy()
+    for column in ("ts_code", "variant"):
+        if column in converted.columns:
+            converted[column] = converted[column].astype("category")
+    return converted
+
+
+def _build_nav_from_returns(ret_df: pd.DataFrame, base: pd.Series | None = None) -> pd.DataFrame:
     nav_df = ret_df.sort_values("date").copy()
-    nav_df["zoo_strict_nav"] = (1 + nav_df["zoo_strict_ret"]).cumprod()
-    nav_df["zoo_extended_nav"] = (1 + nav_df["zoo_extended_ret"]).cumprod()
-    nav_df["hs300_nav"] = (1 + nav_df["hs300_ret"]).cumprod()
+    # One cumprod over a contiguous 2D array instead of three indexed
+    # Series ops.
+    ret_arr = nav_df[["zoo_strict_ret", "zoo_extended_ret", "hs300_ret"]].to_numpy(
+        dtype="float64"
+    )
+    nav_arr = np.cumprod(1.0 + ret_arr, axis=0)
+    if base is not None:
+        # Seed the cumulative products with previously stored NAVs so a
+        # tail-only rebuild continues the existing series.
+        nav_arr *= np.array(
+            [
+                float(base["zoo_strict_nav"]),
+                float(base["zoo_extended_nav"]),
+                float(base["hs300_nav"]),
+            ]
+        )
+    nav_df[["zoo_strict_nav", "zoo_extended_nav", "hs300_nav"]] = nav_arr
     return nav_df
 
 
@@ -359,6 +645,7 @@ def _run_backfill(
     write_snapshots: bool,
     backfill_mode: str,
     snapshot_rules: bool,
+    cache_dir: Path | None = None,
 ) -> int:
     target_dates = sorted(set(target_dates))
     if not target_dates:
@@ -372,9 +659,17 @@ def _run_backfill(
 
     nav_path = docs_dir / "nav.csv"
     existing_nav = load_nav(nav_path)
-    existing_dates = set(existing_nav["date"]) if not existing_nav.empty else set()
     if backfill_mode == "missing":
-        run_dates = [date for date in target_dates if date not in existing_dates]
+        if existing_nav.empty:
+            run_dates = target_dates
+        else:
+            # Vectorized set difference over fixed-width date strings; both
+            # sides are already unique, and the result keeps sorted order.
+            run_dates = np.setdiff1d(
+                np.asarray(target_dates, dtype="U8"),
+                existing_nav["date"].to_numpy(dtype="U8"),
+                assume_unique=True,
+            ).tolist()
         if not run_dates:
             print("回填跳过：指定区间已存在，无需更新。")
             return 0
@@ -385,19 +680,10 @@ def _run_backfill(
         snapshot_path = _snapshot_rules(rules_path, data_dir, target_dates[0], target_dates[-1])
         print(f"回填规则快照已保存：{snapshot_path}")
 
-    prev_date_map: dict[str, str] = {}
-    for idx, date in enumerate(target_dates):
-        if idx == 0:
-            prev_date_map[date] = _resolve_previous_open_date(client, date)
-        else:
-            prev_date_map[date] = target_dates[idx - 1]
-
-    adj_factor_cache: dict[str, pd.DataFrame] = {}
-
-    def _get_adj_factors(date: str) -> pd.DataFrame:
-        if date not in adj_factor_cache:
-            adj_factor_cache[date] = client.get_adj_factor(date)
-        return adj_factor_cache[date]
+    # target_dates are consecutive open days, so each previous open day is
+    # simply the prior element; only the first date needs a calendar lookup.
+    prev_date_map = dict(zip(target_dates[1:], target_dates))
+    prev_date_map[target_dates[0]] = _resolve_previous_open_date(client, target_dates[0])
 
     try:
         stock_basic = client.get_stock_basic()
@@ -419,127 +705,233 @@ def _run_backfill(
     last_extended_stats = None
     last_strict_constituents = pd.DataFrame()
     last_extended_constituents = pd.DataFrame()
-    month_cache: dict[str, str] = {}
+    # Warm the month cache from disk, then with one calendar-range call
+    # covering the whole span when months are still missing; remaining
+    # misses fall back to per-month lookups inside _month_first_open_date.
+    month_cache = _load_month_cache(cache_dir)
+    if not {date[:6] for date in run_dates}.issubset(month_cache):
+        try:
+            month_cache.update(_precompute_month_first(client, run_dates[0], run_dates[-1]))
+        except Exception:
+            pass
     constituents_cache: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
 
-    for trade_date in run_dates:
+    benchmark_ret_map: dict[str, float] = {}
+    if len(run_dates) > 1:
+        span_start = min(run_dates[0], prev_date_map[run_dates[0]])
         try:
-            rebalance_date = _month_first_open_date(client, trade_date, month_cache)
-            strict_df, extended_df = _get_constituents_for_rebalance(
-                constituents_cache,
-                stock_basic,
-                namechange,
-                rules,
-                rebalance_date,
+            _prime_benchmark_range(client, benchmark, span_start, run_dates[-1])
+            benchmark_ret_map = _precompute_benchmark_returns(
+                client, benchmark, span_start, run_dates[-1]
             )
         except Exception as exc:
-            print(f"获取成分股失败({trade_date})：{exc}")
-            return 1
+            print(f"基准区间预取失败，将回退逐日获取：{exc}")
 
-        try:
-            daily_prices = client.get_daily(trade_date)
-        except Exception as exc:
-            print(f"获取日行情失败({trade_date})：{exc}")
-            return 1
-
-        if daily_prices.empty:
-            print(f"{trade_date} 日行情为空，无法计算指数。")
-            return 1
-
-        prev_date = prev_date_map[trade_date]
-        try:
-            adj_factors = _get_adj_factors(trade_date)
-            prev_adj_factors = _get_adj_factors(prev_date)
-        except Exception as exc:
-            print(f"获取复权因子失败({trade_date})：{exc}")
-            return 1
-        if adj_factors.empty or prev_adj_factors.empty:
-            print(f"{trade_date} 复权因子为空，无法计算指数。")
+    # Per-day quotes and adjustment factors are independent blocking HTTP
+    # calls; prefetch them on a bounded pool (friendly to Tushare rate
+    # limits) and consume the futures in date order below.
+    adj_factor_cache: dict[str, pd.DataFrame] = {}
+    # prev_date_map spans all target dates; only prefetch factors for the
+    # dates this run actually processes, not the whole requested span.
+    adj_dates = sorted({*run_dates, *(prev_date_map[date] for date in run_dates)})
+    # Already-cached daily tables come back in one bulk dataset scan; only
+    # the dates that actually need the API go through the pool.
+    cached_daily = client.get_daily_range(run_dates, fetch_missing=False)
+    with ThreadPoolExecutor(max_workers=8) as fetch_pool:
+        daily_futures = {
+            date: fetch_pool.submit(client.get_daily, date)
+            for date in run_dates
+            if date not in cached_daily
+        }
+        adj_futures = {date: fetch_pool.submit(client.get_adj_factor, date) for date in adj_dates}
+
+        def _abort_fetches() -> int:
+            # Error exit: drop everything still queued so leaving the pool
+            # doesn't sit through (and spend quota on) thousands of pending
+            # fetches that each retry their full backoff.
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
             return 1
 
-        strict_ret, strict_holdings, strict_stats = compute_equal_weight_return(
-            strict_df, daily_prices, adj_factors, prev_adj_factors
-        )
-        extended_ret, extended_holdings, extended_stats = compute_equal_weight_return(
-            extended_df, daily_prices, adj_factors, prev_adj_factors
-        )
+        def _get_adj_factors(date: str) -> pd.DataFrame:
+            if date not in adj_factor_cache:
+                future = adj_futures.get(date)
+                adj_factor_cache[date] = (
+                    future.result() if future is not None else client.get_adj_factor(date)
+                )
+            return adj_factor_cache[date]
 
-        if strict_stats.priced_constituents == 0 or extended_stats.priced_constituents == 0:
-            print(f"{trade_date} 成分股行情为空，无法计算指数。")
-            return 1
+        # Consecutive dates sharing a rebalance month also share a
+        # constituent set, so the equal-weight computation is batched per
+        # group: one merge against the month's prices instead of one per day.
+        rebalance_groups: list[tuple[str, list[str]]] = []
+        for trade_date in run_dates:
+            try:
+                rebalance_date = _month_first_open_date(client, trade_date, month_cache)
+            except Exception as exc:
+                print(f"获取成分股失败({trade_date})：{exc}")
+                return _abort_fetches()
+            if rebalance_groups and rebalance_groups[-1][0] == rebalance_date:
+                rebalance_groups[-1][1].append(trade_date)
+            else:
+                rebalance_groups.append((rebalance_date, [trade_date]))
+        _save_month_cache(cache_dir, month_cache)
 
-        try:
-            benchmark_ret = _get_benchmark_return(
-                client,
-                trade_date,
-                prev_date,
-                benchmark,
-                daily_prices=daily_prices,
-                adj_factors=adj_factors,
-                prev_adj_factors=prev_adj_factors,
+        for rebalance_date, month_dates in rebalance_groups:
+            try:
+                strict_df, extended_df = _get_constituents_for_rebalance(
+                    constituents_cache,
+                    stock_basic,
+                    namechange,
+                    rules,
+                    rebalance_date,
+                    cache_dir=cache_dir,
+                )
+            except Exception as exc:
+                print(f"获取成分股失败({month_dates[0]})：{exc}")
+                return _abort_fetches()
+
+            daily_by_date: dict[str, pd.DataFrame] = {}
+            adj_by_date: dict[str, pd.DataFrame] = {}
+            for trade_date in month_dates:
+                try:
+                    daily_frame = cached_daily.get(trade_date)
+                    if daily_frame is None:
+                        daily_frame = daily_futures[trade_date].result()
+                    daily_by_date[trade_date] = daily_frame
+                except Exception as exc:
+                    print(f"获取日行情失败({trade_date})：{exc}")
+                    return _abort_fetches()
+                if daily_by_date[trade_date].empty:
+                    print(f"{trade_date} 日行情为空，无法计算指数。")
+                    return _abort_fetches()
+
+                prev_date = prev_date_map[trade_date]
+                try:
+                    adj_by_date[trade_date] = _get_adj_factors(trade_date)
+                    adj_by_date[prev_date] = _get_adj_factors(prev_date)
+                except Exception as exc:
+                    print(f"获取复权因子失败({trade_date})：{exc}")
+                    return _abort_fetches()
+                if adj_by_date[trade_date].empty or adj_by_date[prev_date].empty:
+                    print(f"{trade_date} 复权因子为空，无法计算指数。")
+                    return _abort_fetches()
+
+            strict_results = compute_equal_weight_returns_batch(
+                strict_df, daily_by_date, adj_by_date, prev_date_map, month_dates
+            )
+            extended_results = compute_equal_weight_returns_batch(
+                extended_df, daily_by_date, adj_by_date, prev_date_map, month_dates
             )
-        except Exception as exc:
-            print(f"获取基准行情失败({trade_date})：{exc}")
-            return 1
 
-        ret_rows.append(
-            {
-                "date": trade_date,
-                "zoo_strict_ret": strict_ret,
-                "zoo_extended_ret": extended_ret,
-                "hs300_ret": benchmark_ret,
-            }
-        )
+            for trade_date in month_dates:
+                strict_ret, strict_holdings, strict_stats = strict_results[trade_date]
+                extended_ret, extended_holdings, extended_stats = extended_results[trade_date]
+
+                if strict_stats.priced_constituents == 0 or extended_stats.priced_constituents == 0:
+                    print(f"{trade_date} 成分股行情为空，无法计算指数。")
+                    return _abort_fetches()
+
+                if trade_date in benchmark_ret_map:
+                    benchmark_ret = benchmark_ret_map[trade_date]
+                else:
+                    prev_date = prev_date_map[trade_date]
+                    try:
+                        benchmark_ret = _get_benchmark_return(
+                            client,
+                            trade_date,
+                            prev_date,
+                            benchmark,
+                            daily_prices=daily_by_date[trade_date],
+                            adj_factors=adj_by_date[trade_date],
+                            prev_adj_factors=adj_by_date[prev_date],
+                        )
+                    except Exception as exc:
+                        print(f"获取基准行情失败({trade_date})：{exc}")
+                        return _abort_fetches()
+
+                ret_rows.append(
+                    {
+                        "date": trade_date,
+                        "zoo_strict_ret": strict_ret,
+                        "zoo_extended_ret": extended_ret,
+                        "hs300_ret": benchmark_ret,
+                    }
+                )
 
-        if write_snapshots:
-            holdings_path = data_dir / f"holdings_{trade_date}.csv"
-            save_holdings(holdings_path, strict_holdings, extended_holdings)
-
-        last_date = trade_date
-        last_strict_holdings = strict_holdings
-        last_extended_holdings = extended_holdings
-        last_strict_stats = strict_stats
-        last_extended_stats = extended_stats
-        last_strict_constituents = strict_df
-        last_extended_constituents = extended_df
-
-        print(
-            "回填："
-            f"日期 {trade_date}，严格 {strict_ret:.4%}，"
-            f"扩展 {extended_ret:.4%}，{benchmark.label} {benchmark_ret:.4%}。"
-        )
+                if write_snapshots:
+                    holdings_path = data_dir / f"holdings_{trade_date}.parquet"
+                    save_holdings(holdings_path, strict_holdings, extended_holdings)
+
+                last_date = trade_date
+                last_strict_holdings = strict_holdings
+                last_extended_holdings = extended_holdings
+                last_strict_stats = strict_stats
+                last_extended_stats = extended_stats
+                last_strict_constituents = strict_df
+                last_extended_constituents = extended_df
+
+                print(
+                    "回填："
+                    f"日期 {trade_date}，严格 {strict_ret:.4%}，"
+                    f"扩展 {extended_ret:.4%}，{benchmark.label} {benchmark_ret:.4%}。"
+                )
 
-    existing_returns = (
-        existing_nav[["date", "zoo_strict_ret", "zoo_extended_ret", "hs300_ret"]]
-        if not existing_nav.empty
-        else pd.DataFrame()
-    )
-    combined_returns = pd.concat([existing_returns, pd.DataFrame(ret_rows)], ignore_index=True)
-    combined_returns = combined_returns.drop_duplicates(subset=["date"], keep="last")
-    if combined_returns.empty:
-        print("回填失败，缺少收益数据。")
-        return 1
-    nav_df = _build_nav_from_returns(combined_returns)
+    new_returns = pd.DataFrame(ret_rows)
+    nav_columns = ["date", "zoo_strict_ret", "zoo_extended_ret", "hs300_ret",
+                   "zoo_strict_nav", "zoo_extended_nav", "hs300_nav"]
+    if (
+        not existing_nav.empty
+        and not new_returns.empty
+        and set(nav_columns).issubset(existing_nav.columns)
+        and new_returns["date"].min() > existing_nav["date"].max()
+    ):
+        # Pure tail append: compound only the new rows on top of the stored
+        # NAVs instead of recomputing the cumprod over the whole history.
+        existing_sorted = existing_nav.sort_values("date")
+        tail_nav = _build_nav_from_returns(new_returns, base=existing_sorted.iloc[-1])
+        nav_df = pd.concat(
+            [existing_sorted[nav_columns], tail_nav[nav_columns]], ignore_index=True
+        )
+    else:
+        # Dict merge keyed by date gives the same keep-last dedup semantics
+        # as concat + drop_duplicates without the hash pass over the full
+        # history.
+        merged: dict[str, dict] = {}
+        if not existing_nav.empty:
+            for row in existing_nav[
+                ["date", "zoo_strict_ret", "zoo_extended_ret", "hs300_ret"]
+            ].to_dict("records"):
+                merged[row["date"]] = row
+        merged.update({row["date"]: row for row in ret_rows})
+        if not merged:
+            print("回填失败，缺少收益数据。")
+            return 1
+        combined_returns = pd.DataFrame([merged[date] for date in sorted(merged)])
+        nav_df = _build_nav_from_returns(combined_returns)
     nav_df.to_csv(nav_path, index=False)
     latest = nav_df.iloc[-1]
 
     if last_date:
-        constituents_path = data_dir / f"constituents_{last_date}.csv"
+        constituents_path = data_dir / f"constituents_{last_date}.parquet"
         today_constituents = save_constituents(
             constituents_path, last_strict_constituents, last_extended_constituents
         )
+        _append_snapshot_index(data_dir, "constituents", last_date)
 
-        holdings_path = data_dir / f"holdings_{last_date}.csv"
+        holdings_path = data_dir / f"holdings_{last_date}.parquet"
         save_holdings(holdings_path, last_strict_holdings, last_extended_holdings)
 
         previous_constituents_path = _find_previous_snapshot(data_dir, "constituents", last_date)
         previous_constituents = (
-            pd.read_csv(previous_constituents_path)
+            load_snapshot(previous_constituents_path, columns=["ts_code", "name", "variant"])
             if previous_constituents_path
             else pd.DataFrame()
         )
 
-        changes = compute_changes(today_constituents, previous_constituents)
+        changes = compute_changes(
+            _categorize_for_changes(today_constituents),
+            _categorize_for_changes(previous_constituents),
+        )
         suspected_noise = compute_suspected_noise(today_constituents)
         changes_path = data_dir / f"changes_{last_date}.json"
         save_changes(changes_path, last_date, changes, suspected_noise)
@@ -573,7 +965,7 @@ def _run_backfill(
 
 def main() -> int:
     args = _parse_args()
-    repo_root = Path(__file__).resolve().parents[1]
+    repo_root = REPO_ROOT
 
     rules_path = Path(args.rules).resolve() if args.rules else repo_root / "rules.yml"
     token = args.token.strip() or os.getenv("TUSHARE_TOKEN", "").strip()
@@ -670,6 +1062,7 @@ def main() -> int:
             args.backfill_write_snapshots,
             args.backfill_mode,
             not args.no_rules_snapshot,
+            cache_dir=cache_dir if not (args.no_cache or args.force_refresh) else None,
         )
 
     if date_arg:
@@ -704,39 +1097,47 @@ def main() -> int:
             )
             return 1
 
-    try:
-        stock_basic = client.get_stock_basic()
-    except Exception as exc:
-        print(f"获取股票列表失败：{exc}")
-        return 1
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        stock_basic_future = executor.submit(client.get_stock_basic)
+        namechange_future = executor.submit(client.get_namechange)
+        daily_future = executor.submit(client.get_daily, date)
 
-    try:
-        namechange = client.get_namechange()
-    except Exception as exc:
-        print(f"获取历史简称失败：{exc}")
-        return 1
+        try:
+            stock_basic = stock_basic_future.result()
+        except Exception as exc:
+            print(f"获取股票列表失败：{exc}")
+            return 1
+
+        try:
+            namechange = namechange_future.result()
+        except Exception as exc:
+            print(f"获取历史简称失败：{exc}")
+            return 1
 
-    month_cache: dict[str, str] = {}
+        try:
+            daily_prices = daily_future.result()
+        except Exception as exc:
+            print(f"获取日行情失败：{exc}")
+            return 1
+
+    runtime_cache_dir = cache_dir if not (args.no_cache or args.force_refresh) else None
+    month_cache = _load_month_cache(runtime_cache_dir)
     constituents_cache: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
     try:
         rebalance_date = _month_first_open_date(client, date, month_cache)
+        _save_month_cache(runtime_cache_dir, month_cache)
         strict_df, extended_df = _get_constituents_for_rebalance(
             constituents_cache,
             stock_basic,
             namechange,
             rules,
             rebalance_date,
+            cache_dir=runtime_cache_dir,
         )
     except Exception as exc:
         print(f"获取成分股失败：{exc}")
         return 1
 
-    try:
-        daily_prices = client.get_daily(date)
-    except Exception as exc:
-        print(f"获取日行情失败：{exc}")
-        return 1
-
     if daily_prices.empty:
         print("日行情为空，无法计算指数。")
         return 1
@@ -757,12 +1158,13 @@ def main() -> int:
         print("复权因子为空，无法计算指数。")
         return 1
 
-    strict_ret, strict_holdings, strict_stats = compute_equal_weight_return(
-        strict_df, daily_prices, adj_factors, prev_adj_factors
-    )
-    extended_ret, extended_holdings, extended_stats = compute_equal_weight_return(
-        extended_df, daily_prices, adj_factors, prev_adj_factors
+    # One shared per-code return table serves both variants; the daily/adj
+    # merge is no longer repeated (or thread-overlapped) per constituent set.
+    strict_result, extended_result = compute_equal_weight_returns_shared(
+        [strict_df, extended_df], daily_prices, adj_factors, prev_adj_factors
     )
+    strict_ret, strict_holdings, strict_stats = strict_result
+    extended_ret, extended_holdings, extended_stats = extended_result
 
     if strict_stats.priced_constituents == 0 or extended_stats.priced_constituents == 0:
         print("成分股行情为空，无法计算指数。")
@@ -785,36 +1187,71 @@ def main() -> int:
     badges_dir = docs_dir / "badges"
     _ensure_dirs(data_dir, docs_dir, badges_dir)
 
+    # An idempotent re-run of the latest day leaves nav.csv unchanged, so
+    # the chart PNG would be byte-identical; skip the matplotlib render.
+    chart_up_to_date = False
+    if not existing_nav.empty and date == max(existing_nav["date"]):
+        prior_row = existing_nav[existing_nav["date"] == date].iloc[-1]
+        chart_up_to_date = (
+            float(prior_row["zoo_strict_ret"]) == strict_ret
+            and float(prior_row["zoo_extended_ret"]) == extended_ret
+            and float(prior_row["hs300_ret"]) == benchmark_ret
+            and (docs_dir / "chart.png").exists()
+        )
+
     nav_df, latest = update_nav(nav_path, date, strict_ret, extended_ret, benchmark_ret)
 
-    constituents_path = data_dir / f"constituents_{date}.csv"
+    constituents_path = data_dir / f"constituents_{date}.parquet"
     today_constituents = save_constituents(constituents_path, strict_df, extended_df)
+    _append_snapshot_index(data_dir, "constituents", date)
 
-    holdings_path = data_dir / f"holdings_{date}.csv"
+    holdings_path = data_dir / f"holdings_{date}.parquet"
     save_holdings(holdings_path, strict_holdings, extended_holdings)
 
     previous_constituents_path = _find_previous_snapshot(data_dir, "constituents", date)
     previous_constituents = (
-        pd.read_csv(previous_constituents_path)
+        load_snapshot(previous_constituents_path, columns=["ts_code", "name", "variant"])
         if previous_constituents_path
         else pd.DataFrame()
     )
 
-    changes = compute_changes(today_constituents, previous_constituents)
+    changes = compute_changes(
+        _categorize_for_changes(today_constituents),
+        _categorize_for_changes(previous_constituents),
+    )
     suspected_noise = compute_suspected_noise(today_constituents)
     changes_path = data_dir / f"changes_{date}.json"
     save_changes(changes_path, date, changes, suspected_noise)
 
-    generate_latest_json(docs_dir / "latest.json", latest, benchmark.code, benchmark.label)
-    generate_badges(badges_dir, latest, benchmark.label)
-    generate_chart(docs_dir / "chart.png", nav_df, benchmark.label)
-    generate_index_html(
-        docs_dir / "index.html",
-        latest,
-        strict_stats,
-        extended_stats,
-        benchmark.label,
-    )
+    # Chart rendering dominates the output step; overlap it with the small
+    # JSON/HTML writes (generate_chart uses the thread-safe OO API).
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        output_futures = [
+            executor.submit(
+                generate_latest_json,
+                docs_dir / "latest.json",
+                latest,
+                benchmark.code,
+                benchmark.label,
+            ),
+            executor.submit(generate_badges, badges_dir, latest, benchmark.label),
+            executor.submit(
+                generate_index_html,
+                docs_dir / "index.html",
+                latest,
+                strict_stats,
+                extended_stats,
+                benchmark.label,
+            ),
+        ]
+        if chart_up_to_date:
+            print("净值未变化，跳过图表重绘。")
+        else:
+            output_futures.append(
+                executor.submit(generate_chart, docs_dir / "chart.png", nav_df, benchmark.label)
+            )
+        for future in output_futures:
+            future.result()
 
     print(
         "已更新："
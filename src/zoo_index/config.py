@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 import re
 from typing import Iterable
@@ -8,6 +9,12 @@ import warnings
 
 import yaml
 
+try:
+    # libyaml parses several times faster than the pure-Python loader.
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 
 @dataclass(frozen=True)
 class Rules:
@@ -20,7 +27,7 @@ class Rules:
     allow_beijing: bool
 
 
-_TS_CODE_RE = re.compile(r"^\\d{6}\\.(SZ|SH|BJ)$", re.IGNORECASE)
+_TS_CODE_RE = re.compile(r"^\d{6}\.(SZ|SH|BJ)$", re.IGNORECASE)
 
 
 def _as_list(value: object) -> list[str]:
@@ -32,14 +39,8 @@ def _as_list(value: object) -> list[str]:
 
 
 def _unique_preserve(items: Iterable[str]) -> list[str]:
-    seen: set[str] = set()
-    result: list[str] = []
-    for item in items:
-        if item in seen:
-            continue
-        seen.add(item)
-        result.append(item)
-    return result
+    # dict.fromkeys dedups in one C-level pass and keeps insertion order.
+    return list(dict.fromkeys(items))
 
 
 def _filter_ts_codes(items: Iterable[str], field_name: str) -> list[str]:
@@ -61,7 +62,15 @@ def _filter_ts_codes(items: Iterable[str], field_name: str) -> list[str]:
 
 
 def load_rules(path: Path) -> Rules:
-    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    # Rules is frozen, so a cached instance is safe to share; the stat key
+    # invalidates the cache whenever the file changes.
+    stat = path.stat()
+    return _load_rules_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_rules_cached(path_value: str, mtime_ns: int, size: int) -> Rules:
+    data = yaml.load(Path(path_value).read_bytes(), Loader=_SafeLoader) or {}
 
     strict = _as_list(data.get("strict_keywords"))
     extended = _as_list(data.get("extended_keywords"))
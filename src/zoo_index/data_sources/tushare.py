@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cached_property
 from pathlib import Path
+import random
 import time
 
 import pandas as pd
-import tushare as ts
 
 
 @dataclass(frozen=True)
@@ -15,6 +16,52 @@ class TradeCalendarEntry:
     is_open: bool
 
 
+_STOCK_BASIC_TTL_SECONDS = 24 * 3600
+
+# How long an exhausted retry loop keeps the breaker open for the
+# identical query; repeated probes within this window return empty
+# immediately instead of blocking through the full backoff again.
+_CIRCUIT_OPEN_SECONDS = 60.0
+
+_POOLED_SESSION = None
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y%m%d")
+
+
+def _install_pooled_session() -> None:
+    """Route tushare's per-call requests.post through one pooled session.
+
+    DataApi issues a bare ``requests.post`` per query, paying a fresh
+    TCP/TLS handshake every time. A ``requests.Session`` exposes the same
+    ``post`` interface, so swapping the reference inside
+    ``tushare.pro.client`` keeps connections alive across the whole run.
+    """
+    global _POOLED_SESSION
+    if _POOLED_SESSION is not None:
+        return
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from tushare.pro import client as pro_client
+        from urllib3.util.retry import Retry
+    except ImportError:  # pragma: no cover - depends on tushare internals
+        return
+    if not hasattr(pro_client, "requests"):  # pragma: no cover
+        return
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    pro_client.requests = session
+    _POOLED_SESSION = session
+
+
 class TushareClient:
     def __init__(
         self,
@@ -23,52 +70,154 @@ class TushareClient:
         use_cache: bool = True,
         force_refresh: bool = False,
     ) -> None:
-        self._pro = ts.pro_api(token)
+        self._token = token
         self._cache_dir = cache_dir
         self._use_cache = use_cache
         self._force_refresh = force_refresh
+        # Per-date frames sliced out of range fetches, keyed by
+        # (endpoint, ts_code, trade_date); consulted before the per-day
+        # endpoints so primed spans skip the HTTP round trip entirely.
+        self._primed: dict[tuple[str, str, str], pd.DataFrame] = {}
+        # Full range results, keyed by (endpoint, ts_code, start, end), so
+        # repeated range requests within one process hit memory.
+        self._range_memo: dict[tuple[str, str, str, str], pd.DataFrame] = {}
+        # In-process memos for the universe tables: even disk-cache hits
+        # pay a parquet parse, so one fetch per process is enough.
+        self._stock_basic_memo: pd.DataFrame | None = None
+        self._namechange_memo: pd.DataFrame | None = None
+        # Calendar windows requested within one run, keyed by (start, end).
+        self._trade_cal_memo: dict[tuple[str, str], pd.DataFrame] = {}
+        # Frames already decoded from (or written to) the parquet cache, so
+        # repeated cache hits within one run skip the parquet parse.
+        self._mem_cache: dict[Path, pd.DataFrame] = {}
+        # Timestamp of the last exhausted retry loop per exact query
+        # (endpoint, ts_code, dates); see _fetch_with_retry.
+        self._fail_cache: dict[tuple[str, ...], float] = {}
+
+    @cached_property
+    def _pro(self):
+        # Deferred: importing the tushare SDK and building the API handle
+        # take noticeable time, and runs that are fully served from the
+        # disk cache (plus the --help / missing-token exits) never need it.
+        import tushare as ts
+
+        _install_pooled_session()
+        return ts.pro_api(self._token)
 
     def _cache_path(self, *parts: str) -> Path | None:
         if self._cache_dir is None:
             return None
         return self._cache_dir.joinpath(*parts)
 
-    def _read_cache(self, path: Path | None) -> pd.DataFrame | None:
+    def _read_cache(
+        self, path: Path | None, max_age_seconds: float | None = None
+    ) -> pd.DataFrame | None:
         if path is None or not self._use_cache or self._force_refresh:
             return None
         if not path.exists():
             return None
-        return pd.read_parquet(path)
+        if max_age_seconds is not None:
+            age = time.time() - path.stat().st_mtime
+            if age > max_age_seconds:
+                return None
+        if path in self._mem_cache:
+            return self._mem_cache[path]
+        df = pd.read_parquet(path)
+        self._mem_cache[path] = df
+        return df
 
     def _write_cache(self, path: Path | None, df: pd.DataFrame) -> None:
         if path is None or not self._use_cache or df.empty:
             return
         path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_parquet(path, index=False)
+        # zstd compresses roughly twice as well as the default snappy on
+        # these frames at negligible extra CPU.
+        df.to_parquet(path, index=False, compression="zstd")
+        self._mem_cache[path] = df
+
+    def _fetch_with_retry(
+        self,
+        fetch,
+        fail_key: tuple[str, ...],
+        *,
+        max_attempts: int = 5,
+        base: float = 0.6,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Retry ``fetch`` with jittered exponential backoff.
+
+        An exhausted loop opens a circuit for ``fail_key``, which names the
+        exact query (endpoint, ts_code and dates): repeating the identical
+        query within _CIRCUIT_OPEN_SECONDS returns empty immediately
+        instead of sleeping through the whole backoff for a date that is
+        simply not published yet. Other dates on the same endpoint are
+        unaffected.
+        """
+        last_failure = self._fail_cache.get(fail_key)
+        if last_failure is not None:
+            if time.time() - last_failure < _CIRCUIT_OPEN_SECONDS:
+                return pd.DataFrame()
+            # pop, not del: the prefetch pool may clear the same expired
+            # entry from several workers at once.
+            self._fail_cache.pop(fail_key, None)
+        last = pd.DataFrame()
+        for attempt in range(max_attempts):
+            df = fetch(**kwargs)
+            if not df.empty:
+                return df
+            last = df
+            if attempt < max_attempts - 1:
+                # Jitter keeps concurrent workers from retrying in lockstep.
+                time.sleep(base * (2**attempt) * (1 + random.random()) / 2)
+        self._fail_cache[fail_key] = time.time()
+        return last
 
     def _trade_cal_with_retry(self, **kwargs) -> pd.DataFrame:
+        # In-process memo: several code paths request identical calendar
+        # windows within one run, and the calendar for a fixed window never
+        # changes mid-process. Only successful fetches are memoized.
+        memo_key = (kwargs.get("start_date", ""), kwargs.get("end_date", ""))
+        if memo_key in self._trade_cal_memo:
+            return self._trade_cal_memo[memo_key]
         last_df = pd.DataFrame()
         for attempt in range(3):
             df = self._pro.trade_cal(**kwargs)
             if not df.empty:
+                self._trade_cal_memo[memo_key] = df
                 return df
             last_df = df
             time.sleep(0.5 * (2**attempt))
         return last_df
 
+    def _trade_cal_cache_path(self, start_date: str, end_date: str) -> Path | None:
+        # Past calendar days never change, so only those are cached; ranges
+        # touching today or the future always go to the API.
+        if end_date >= _today():
+            return None
+        return self._cache_path("trade_cal", f"{start_date}_{end_date}.parquet")
+
     def get_trade_calendar(self, date: str) -> TradeCalendarEntry:
-        df = self._trade_cal_with_retry(
-            exchange="",
-            start_date=date,
-            end_date=date,
-            fields="cal_date,is_open",
-        )
-        if df.empty:
-            raise ValueError("trade calendar is empty")
+        cache_path = self._trade_cal_cache_path(date, date)
+        df = self._read_cache(cache_path)
+        if df is None:
+            df = self._trade_cal_with_retry(
+                exchange="",
+                start_date=date,
+                end_date=date,
+                fields="cal_date,is_open",
+            )
+            if df.empty:
+                raise ValueError("trade calendar is empty")
+            self._write_cache(cache_path, df)
         row = df.iloc[0]
-        return TradeCalendarEntry(date=row["cal_date"], is_open=bool(row["is_open"]))
+        return TradeCalendarEntry(date=str(row["cal_date"]), is_open=bool(row["is_open"]))
 
     def get_trade_calendar_range(self, start_date: str, end_date: str) -> pd.DataFrame:
+        cache_path = self._trade_cal_cache_path(start_date, end_date)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            cached["cal_date"] = cached["cal_date"].astype(str)
+            return cached
         df = self._trade_cal_with_retry(
             exchange="",
             start_date=start_date,
@@ -77,6 +226,7 @@ class TushareClient:
         )
         if df.empty:
             raise ValueError("trade calendar is empty")
+        self._write_cache(cache_path, df)
         df["cal_date"] = df["cal_date"].astype(str)
         return df
 
@@ -91,11 +241,11 @@ class TushareClient:
         )
         if df.empty:
             raise ValueError("trade calendar is empty")
-        open_days = df[df["is_open"] == 1].copy()
+        open_days = df[df["is_open"] == 1]
         if open_days.empty:
             raise ValueError("no open trading day found")
-        open_days["cal_date"] = open_days["cal_date"].astype(str)
-        return open_days.sort_values("cal_date").iloc[-1]["cal_date"]
+        # Only the latest date matters, so a single max() beats sorting.
+        return str(open_days["cal_date"].astype(str).max())
 
     def get_recent_open_dates(
         self, end_date: str, count: int, lookback_days: int | None = None
@@ -103,12 +253,15 @@ class TushareClient:
         if count <= 0:
             raise ValueError("count must be positive")
         if lookback_days is None:
-            lookback_days = max(count * 2, 60)
+            # ~250 open days per 365 calendar days; the slack covers holiday
+            # clusters so the first window almost always suffices.
+            lookback_days = max(int(count * 1.6) + 20, 60)
 
         end = datetime.strptime(end_date, "%Y%m%d")
-        attempts = 0
-        while True:
-            start = end - timedelta(days=lookback_days)
+        # One generous fetch, then a single ten-year fallback instead of
+        # repeatedly doubling the window with an API call per attempt.
+        for window in (lookback_days, 3650):
+            start = end - timedelta(days=window)
             df = self._trade_cal_with_retry(
                 exchange="",
                 start_date=start.strftime("%Y%m%d"),
@@ -117,21 +270,32 @@ class TushareClient:
             )
             if df.empty:
                 raise ValueError("trade calendar is empty")
-            open_days = df[df["is_open"] == 1].copy()
-            if open_days.empty:
+            mask = df["is_open"].to_numpy() == 1
+            dates = df["cal_date"].to_numpy()[mask].astype("U8")
+            if dates.size == 0:
                 raise ValueError("no open trading day found")
-            open_days["cal_date"] = open_days["cal_date"].astype(str)
-            dates = open_days.sort_values("cal_date")["cal_date"].tolist()
-            if len(dates) >= count:
-                return dates[-count:]
-            attempts += 1
-            if attempts >= 5 or lookback_days >= 3650:
-                raise ValueError("not enough open trading days found")
-            lookback_days *= 2
+            if dates.size >= count:
+                dates.sort()
+                return dates[-count:].tolist()
+        raise ValueError("not enough open trading days found")
 
     def get_stock_basic(self) -> pd.DataFrame:
+        # Process-wide memo: both entry points and repeated invocations in
+        # one process reuse the first (disk-cached or fetched) frame.
+        if self._stock_basic_memo is not None:
+            return self._stock_basic_memo
+        df = self._fetch_stock_basic()
+        # Categorical codes turn the downstream exchange/market isin filters
+        # into int-code comparisons instead of per-string hashing.
+        for column in ("exchange", "market"):
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+        self._stock_basic_memo = df
+        return df
+
+    def _fetch_stock_basic(self) -> pd.DataFrame:
         cache_path = self._cache_path("stock_basic.parquet")
-        cached = self._read_cache(cache_path)
+        cached = self._read_cache(cache_path, max_age_seconds=_STOCK_BASIC_TTL_SECONDS)
         if cached is not None:
             return cached
         fields = "ts_code,name,exchange,market,list_date,delist_date"
@@ -148,8 +312,14 @@ class TushareClient:
         return df
 
     def get_namechange(self) -> pd.DataFrame:
+        if self._namechange_memo is not None:
+            return self._namechange_memo
+        self._namechange_memo = self._fetch_namechange()
+        return self._namechange_memo
+
+    def _fetch_namechange(self) -> pd.DataFrame:
         cache_path = self._cache_path("namechange.parquet")
-        cached = self._read_cache(cache_path)
+        cached = self._read_cache(cache_path, max_age_seconds=_STOCK_BASIC_TTL_SECONDS)
         if cached is not None:
             return cached
         df = self._pro.namechange(fields="ts_code,name,start_date,end_date")
@@ -163,91 +333,232 @@ class TushareClient:
         cached = self._read_cache(cache_path)
         if cached is not None:
             return cached
-        last = pd.DataFrame()
-        for attempt in range(5):
-            df = self._pro.daily(
-                trade_date=trade_date,
-                fields="ts_code,close,pre_close",
-            )
-            if not df.empty:
-                self._write_cache(cache_path, df)
-                return df
-            last = df
-            time.sleep(0.6 * (2**attempt))
-        return last
+        df = self._fetch_with_retry(
+            self._pro.daily,
+            ("daily", "", trade_date),
+            trade_date=trade_date,
+            # trade_date rides along so bulk dataset scans over the cache
+            # files can attribute rows back to their date.
+            fields="ts_code,trade_date,close,pre_close",
+        )
+        if not df.empty:
+            self._write_cache(cache_path, df)
+        return df
+
+    def get_daily_range(
+        self, dates: list[str], fetch_missing: bool = True
+    ) -> dict[str, pd.DataFrame]:
+        """Bulk daily quotes keyed by trade date.
+
+        Every cached date is read in a single pyarrow dataset scan — one
+        parallel multi-file read instead of a read_parquet call per file.
+        Dates absent from the cache (or written before trade_date was
+        cached) fall back to get_daily when fetch_missing is set.
+        """
+        result: dict[str, pd.DataFrame] = {}
+        pending_paths: list[Path] = []
+        if self._cache_dir is not None and self._use_cache and not self._force_refresh:
+            for date in dates:
+                path = self._cache_path("daily", f"{date}.parquet")
+                mem = self._mem_cache.get(path)
+                if mem is not None:
+                    result[date] = mem
+                elif path is not None and path.exists():
+                    pending_paths.append(path)
+        if pending_paths:
+            try:
+                import pyarrow.dataset as pa_ds
+
+                frame = pa_ds.dataset(
+                    [str(path) for path in pending_paths], format="parquet"
+                ).to_table().to_pandas()
+            except Exception:  # pragma: no cover - pyarrow/file specifics
+                frame = pd.DataFrame()
+            if "trade_date" in frame.columns:
+                frame["trade_date"] = frame["trade_date"].astype(str)
+                for date, group in frame.groupby("trade_date", sort=False):
+                    result[str(date)] = group.reset_index(drop=True)
+        if fetch_missing:
+            for date in dates:
+                if date not in result:
+                    result[date] = self.get_daily(date)
+        return result
+
+    def get_daily_row(self, trade_date: str, ts_code: str) -> pd.DataFrame:
+        """Single-code daily quote; a cheap readiness probe versus the full
+        ~5000-row table, with no retry loop since an empty result is the
+        answer the probe is after."""
+        key = ("daily", ts_code, trade_date)
+        if key in self._primed:
+            return self._primed[key]
+        df = self._pro.daily(
+            trade_date=trade_date,
+            ts_code=ts_code,
+            fields="ts_code,close,pre_close",
+        )
+        if not df.empty:
+            self._primed[key] = df
+        return df
 
     def get_adj_factor(self, trade_date: str) -> pd.DataFrame:
         cache_path = self._cache_path("adj_factor", f"{trade_date}.parquet")
         cached = self._read_cache(cache_path)
         if cached is not None:
             return cached
-        last = pd.DataFrame()
-        for attempt in range(5):
-            df = self._pro.adj_factor(
-                trade_date=trade_date,
-                fields="ts_code,trade_date,adj_factor",
-            )
-            if not df.empty:
-                df = df.drop_duplicates(subset=["ts_code"])
-                self._write_cache(cache_path, df)
-                return df
-            last = df
-            time.sleep(0.6 * (2**attempt))
-        return last
+        df = self._fetch_with_retry(
+            self._pro.adj_factor,
+            ("adj_factor", "", trade_date),
+            trade_date=trade_date,
+            fields="ts_code,trade_date,adj_factor",
+        )
+        if not df.empty:
+            df = df.drop_duplicates(subset=["ts_code"])
+            self._write_cache(cache_path, df)
+        return df
+
+    def _range_cache_path(self, endpoint: str, ts_code: str, start_date: str, end_date: str) -> Path | None:
+        if end_date >= _today():
+            return None
+        return self._cache_path(endpoint, ts_code, f"{start_date}_{end_date}.parquet")
+
+    def _fetch_range(
+        self,
+        endpoint: str,
+        ts_code: str,
+        start_date: str,
+        end_date: str,
+        fetch,
+        **kwargs,
+    ) -> pd.DataFrame:
+        memo_key = (endpoint, ts_code, start_date, end_date)
+        memo = self._range_memo.get(memo_key)
+        if memo is not None:
+            return memo
+        cache_path = self._range_cache_path(endpoint, ts_code, start_date, end_date)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            self._range_memo[memo_key] = cached
+            return cached
+        df = self._fetch_with_retry(fetch, (endpoint, ts_code, start_date, end_date), **kwargs)
+        if not df.empty:
+            df["trade_date"] = df["trade_date"].astype(str)
+            self._write_cache(cache_path, df)
+            self._range_memo[memo_key] = df
+        return df
+
+    def _prime_by_date(self, endpoint: str, ts_code: str, df: pd.DataFrame) -> None:
+        if df.empty or "trade_date" not in df.columns:
+            return
+        for trade_date, group in df.groupby("trade_date"):
+            self._primed[(endpoint, ts_code, str(trade_date))] = group.reset_index(drop=True)
+
+    def get_index_daily_range(self, start_date: str, end_date: str, ts_code: str) -> pd.DataFrame:
+        return self._fetch_range(
+            "index_daily_range",
+            ts_code,
+            start_date,
+            end_date,
+            self._pro.index_daily,
+            ts_code=ts_code,
+            start_date=start_date,
+            end_date=end_date,
+            fields="ts_code,trade_date,close,pre_close",
+        )
+
+    def get_fund_daily_range(self, start_date: str, end_date: str, ts_code: str) -> pd.DataFrame:
+        return self._fetch_range(
+            "fund_daily_range",
+            ts_code,
+            start_date,
+            end_date,
+            self._pro.fund_daily,
+            ts_code=ts_code,
+            start_date=start_date,
+            end_date=end_date,
+            fields="ts_code,trade_date,close,pre_close",
+        )
+
+    def get_fund_adj_range(self, start_date: str, end_date: str, ts_code: str) -> pd.DataFrame:
+        return self._fetch_range(
+            "fund_adj_range",
+            ts_code,
+            start_date,
+            end_date,
+            self._pro.fund_adj,
+            ts_code=ts_code,
+            start_date=start_date,
+            end_date=end_date,
+            fields="ts_code,trade_date,adj_factor",
+        )
+
+    def prime_index_daily(self, start_date: str, end_date: str, ts_code: str) -> None:
+        self._prime_by_date(
+            "index_daily", ts_code, self.get_index_daily_range(start_date, end_date, ts_code)
+        )
+
+    def prime_fund_daily(self, start_date: str, end_date: str, ts_code: str) -> None:
+        self._prime_by_date(
+            "fund_daily", ts_code, self.get_fund_daily_range(start_date, end_date, ts_code)
+        )
+
+    def prime_fund_adj(self, start_date: str, end_date: str, ts_code: str) -> None:
+        self._prime_by_date(
+            "fund_adj", ts_code, self.get_fund_adj_range(start_date, end_date, ts_code)
+        )
 
     def get_index_daily(self, trade_date: str, ts_code: str) -> pd.DataFrame:
+        primed = self._primed.get(("index_daily", ts_code, trade_date))
+        if primed is not None:
+            return primed
         cache_path = self._cache_path("index_daily", ts_code, f"{trade_date}.parquet")
         cached = self._read_cache(cache_path)
         if cached is not None:
             return cached
-        last = pd.DataFrame()
-        for attempt in range(5):
-            df = self._pro.index_daily(
-                ts_code=ts_code,
-                trade_date=trade_date,
-                fields="ts_code,close,pre_close",
-            )
-            if not df.empty:
-                self._write_cache(cache_path, df)
-                return df
-            last = df
-            time.sleep(0.6 * (2**attempt))
-        return last
+        df = self._fetch_with_retry(
+            self._pro.index_daily,
+            ("index_daily", ts_code, trade_date),
+            ts_code=ts_code,
+            trade_date=trade_date,
+            fields="ts_code,close,pre_close",
+        )
+        if not df.empty:
+            self._write_cache(cache_path, df)
+        return df
 
     def get_fund_daily(self, trade_date: str, ts_code: str) -> pd.DataFrame:
+        primed = self._primed.get(("fund_daily", ts_code, trade_date))
+        if primed is not None:
+            return primed
         cache_path = self._cache_path("fund_daily", ts_code, f"{trade_date}.parquet")
         cached = self._read_cache(cache_path)
         if cached is not None:
             return cached
-        last = pd.DataFrame()
-        for attempt in range(5):
-            df = self._pro.fund_daily(
-                ts_code=ts_code,
-                trade_date=trade_date,
-                fields="ts_code,trade_date,close,pre_close",
-            )
-            if not df.empty:
-                self._write_cache(cache_path, df)
-                return df
-            last = df
-            time.sleep(0.6 * (2**attempt))
-        return last
+        df = self._fetch_with_retry(
+            self._pro.fund_daily,
+            ("fund_daily", ts_code, trade_date),
+            ts_code=ts_code,
+            trade_date=trade_date,
+            fields="ts_code,trade_date,close,pre_close",
+        )
+        if not df.empty:
+            self._write_cache(cache_path, df)
+        return df
 
     def get_fund_adj(self, trade_date: str, ts_code: str) -> pd.DataFrame:
+        primed = self._primed.get(("fund_adj", ts_code, trade_date))
+        if primed is not None:
+            return primed
         cache_path = self._cache_path("fund_adj", ts_code, f"{trade_date}.parquet")
         cached = self._read_cache(cache_path)
         if cached is not None:
             return cached
-        last = pd.DataFrame()
-        for attempt in range(5):
-            df = self._pro.fund_adj(
-                ts_code=ts_code,
-                trade_date=trade_date,
-                fields="ts_code,trade_date,adj_factor",
-            )
-            if not df.empty:
-                self._write_cache(cache_path, df)
-                return df
-            last = df
-            time.sleep(0.6 * (2**attempt))
-        return last
+        df = self._fetch_with_retry(
+            self._pro.fund_adj,
+            ("fund_adj", ts_code, trade_date),
+            ts_code=ts_code,
+            trade_date=trade_date,
+            fields="ts_code,trade_date,adj_factor",
+        )
+        if not df.empty:
+            self._write_cache(cache_path, df)
+        return df
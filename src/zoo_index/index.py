@@ -2,11 +2,23 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
+try:
+    # Optional: farms the fused return expression across cores for large
+    # universes; the plain numpy path stays the default.
+    import numexpr as _numexpr
+except ImportError:
+    _numexpr = None
+
 from .config import Rules
 from .matcher import Matcher
 
+# Below this row count numexpr's setup overhead outweighs the
+# multi-threaded evaluation win.
+_NUMEXPR_MIN_ROWS = 2000
+
 
 @dataclass(frozen=True)
 class IndexStats:
@@ -19,37 +31,39 @@ def _filter_exchange(df: pd.DataFrame, allow_beijing: bool) -> pd.DataFrame:
     allowed = {"SSE", "SZSE"}
     if allow_beijing:
         allowed.add("BSE")
-    return df[df["exchange"].isin(allowed)].copy()
+    return df[df["exchange"].isin(allowed)]
 
 
 def _filter_st(df: pd.DataFrame, exclude_st: bool) -> pd.DataFrame:
     if not exclude_st:
         return df
-    mask = ~df["name"].str.contains("ST", na=False)
-    return df[mask].copy()
+    # regex=False takes the plain C substring path instead of regex
+    # compilation and traversal per name.
+    mask = ~df["name"].str.contains("ST", regex=False, na=False)
+    return df[mask]
 
 
-def _normalize_date_series(series: pd.Series, default: int) -> pd.Series:
-    values = pd.to_numeric(series, errors="coerce")
-    return values.fillna(default).astype(int)
+def _normalize_date_series(series: pd.Series, default: int) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64")
+    return np.where(np.isnan(values), default, values).astype(np.int64)
 
 
 def _filter_listed_asof(df: pd.DataFrame, as_of: str) -> pd.DataFrame:
     if "list_date" not in df.columns or "delist_date" not in df.columns:
-        return df.copy()
+        return df
     as_of_value = int(as_of)
     list_dates = _normalize_date_series(df["list_date"], 99999999)
     delist_dates = _normalize_date_series(df["delist_date"], 99999999)
     mask = (list_dates <= as_of_value) & (delist_dates >= as_of_value)
-    return df[mask].copy()
+    return df[mask]
 
 
 def _apply_namechange(df: pd.DataFrame, namechange: pd.DataFrame, as_of: str) -> pd.DataFrame:
     if namechange.empty:
-        return df.copy()
+        return df
     required = ["ts_code", "name", "start_date", "end_date"]
     if not set(required).issubset(namechange.columns):
-        return df.copy()
+        return df
     changes = namechange[required].copy()
     changes["start_date_int"] = _normalize_date_series(changes["start_date"], 0)
     changes["end_date_int"] = _normalize_date_series(changes["end_date"], 99999999)
@@ -58,12 +72,11 @@ def _apply_namechange(df: pd.DataFrame, namechange: pd.DataFrame, as_of: str) ->
         (changes["start_date_int"] <= as_of_value) & (changes["end_date_int"] >= as_of_value)
     ]
     if active.empty:
-        return df.copy()
-    active = (
-        active.sort_values(["ts_code", "start_date_int"])
-        .drop_duplicates(subset=["ts_code"], keep="last")
-        .loc[:, ["ts_code", "name"]]
-    )
+        return df
+    # Only the most recent active record per code matters; idxmax picks it
+    # without sorting the whole history.
+    latest = active.groupby("ts_code", sort=False)["start_date_int"].idxmax()
+    active = active.loc[latest, ["ts_code", "name"]]
     merged = df.merge(active, on="ts_code", how="left", suffixes=("", "_asof"))
     merged["name"] = merged["name_asof"].fillna(merged["name"])
     return merged.drop(columns=["name_asof"])
@@ -85,64 +98,83 @@ def prepare_universe_asof(
     return filtered
 
 
+def _build_variant(
+    classified: pd.DataFrame, keyword_column: str, flag_column: str
+) -> pd.DataFrame:
+    rows = classified[classified[flag_column]]
+    if rows.empty:
+        return pd.DataFrame()
+    return pd.DataFrame(
+        {
+            "ts_code": rows["ts_code"].to_numpy(),
+            "name": rows["name"].to_numpy(),
+            "keyword": rows[keyword_column].fillna("").to_numpy(),
+            "forced": rows["forced"].to_numpy(),
+        }
+    )
+
+
 def build_constituents(stock_basic: pd.DataFrame, rules: Rules) -> tuple[pd.DataFrame, pd.DataFrame]:
     matcher = Matcher(rules)
-    strict_rows: list[dict] = []
-    extended_rows: list[dict] = []
-
-    for row in stock_basic.itertuples(index=False):
-        ts_code = row.ts_code
-        name = row.name
-        if pd.isna(name):
-            name = ""
-        if not isinstance(name, str):
-            name = str(name)
-        result = matcher.classify(ts_code, name)
-
-        if result.strict:
-            strict_rows.append(
-                {
-                    "ts_code": ts_code,
-                    "name": name,
-                    "keyword": result.strict_keyword or "",
-                    "forced": result.forced,
-                }
-            )
-        if result.extended:
-            extended_rows.append(
-                {
-                    "ts_code": ts_code,
-                    "name": name,
-                    "keyword": result.extended_keyword or "",
-                    "forced": result.forced,
-                }
-            )
-
-    strict_df = pd.DataFrame(strict_rows)
-    extended_df = pd.DataFrame(extended_rows)
-    return strict_df, extended_df
+    if stock_basic.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    classified = matcher.classify_frame(stock_basic["ts_code"], stock_basic["name"])
+    return (
+        _build_variant(classified, "strict_keyword", "strict"),
+        _build_variant(classified, "extended_keyword", "extended"),
+    )
 
 
-def compute_equal_weight_return(
+def compute_equal_weight_returns_batch(
     constituents: pd.DataFrame,
-    daily_prices: pd.DataFrame,
-    adj_factors: pd.DataFrame | None = None,
-    prev_adj_factors: pd.DataFrame | None = None,
-) -> tuple[float, pd.DataFrame, IndexStats]:
+    daily_by_date: dict[str, pd.DataFrame],
+    adj_by_date: dict[str, pd.DataFrame],
+    prev_date_map: dict[str, str],
+    dates: list[str],
+) -> dict[str, tuple[float, pd.DataFrame, IndexStats]]:
+    """Batched compute_equal_weight_return over many trading days.
+
+    The constituent set is merged against the concatenated daily data once
+    instead of once per day; results are keyed by trade date and match the
+    single-day function's semantics.
+    """
     if constituents.empty:
-        return 0.0, constituents, IndexStats(0, 0, 0)
+        return {date: (0.0, constituents, IndexStats(0, 0, 0)) for date in dates}
 
-    merged = constituents.merge(daily_prices, on="ts_code", how="left")
-    if adj_factors is not None and prev_adj_factors is not None:
+    total = len(constituents)
+    empty_day = (0.0, pd.DataFrame(), IndexStats(total, 0, total))
+
+    daily_frames = [
+        daily_by_date[date].assign(trade_date=date)
+        for date in dates
+        if date in daily_by_date and not daily_by_date[date].empty
+    ]
+    if not daily_frames:
+        return {date: empty_day for date in dates}
+    daily_long = pd.concat(daily_frames, ignore_index=True)
+
+    adj_frames: list[pd.DataFrame] = []
+    prev_frames: list[pd.DataFrame] = []
+    for date in dates:
+        adj = adj_by_date.get(date)
+        prev = adj_by_date.get(prev_date_map.get(date, ""))
+        if adj is not None and not adj.empty:
+            adj_frames.append(adj[["ts_code", "adj_factor"]].assign(trade_date=date))
+        if prev is not None and not prev.empty:
+            prev_frames.append(
+                prev[["ts_code", "adj_factor"]]
+                .rename(columns={"adj_factor": "prev_adj_factor"})
+                .assign(trade_date=date)
+            )
+
+    merged = constituents.merge(daily_long, on="ts_code", how="inner")
+    if adj_frames and prev_frames:
         merged = merged.merge(
-            adj_factors[["ts_code", "adj_factor"]],
-            on="ts_code",
-            how="left",
+            pd.concat(adj_frames, ignore_index=True), on=["ts_code", "trade_date"], how="left"
         )
-        prev_factors = prev_adj_factors[["ts_code", "adj_factor"]].rename(
-            columns={"adj_factor": "prev_adj_factor"}
+        merged = merged.merge(
+            pd.concat(prev_frames, ignore_index=True), on=["ts_code", "trade_date"], how="left"
         )
-        merged = merged.merge(prev_factors, on="ts_code", how="left")
         merged["adj_factor"] = pd.to_numeric(merged["adj_factor"], errors="coerce")
         merged["prev_adj_factor"] = pd.to_numeric(merged["prev_adj_factor"], errors="coerce")
         merged.loc[merged["adj_factor"] <= 0, "adj_factor"] = pd.NA
@@ -153,20 +185,158 @@ def compute_equal_weight_return(
     else:
         merged["ret"] = merged["close"] / merged["pre_close"] - 1
 
-    valid = merged.dropna(subset=["ret", "close", "pre_close"]).copy()
+    valid = merged.dropna(subset=["ret", "close", "pre_close"])
     valid = valid[valid["pre_close"] > 0]
 
+    results: dict[str, tuple[float, pd.DataFrame, IndexStats]] = {}
+    grouped = dict(tuple(valid.groupby("trade_date"))) if not valid.empty else {}
+    for date in dates:
+        day = grouped.get(date)
+        if day is None or day.empty:
+            results[date] = empty_day
+            continue
+        day = day.copy()
+        priced = len(day)
+        day["weight"] = 1.0 / priced
+        holdings = day[
+            ["ts_code", "name", "keyword", "forced", "weight", "ret", "close", "pre_close"]
+        ].reset_index(drop=True)
+        results[date] = (float(day["ret"].mean()), holdings, IndexStats(total, priced, total - priced))
+    return results
+
+
+def _daily_return_table(
+    daily_prices: pd.DataFrame,
+    adj_factors: pd.DataFrame | None = None,
+    prev_adj_factors: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Per-code daily returns shared by every constituent set of one day."""
+    table = daily_prices.set_index("ts_code")[["close", "pre_close"]]
+    if adj_factors is not None and prev_adj_factors is not None:
+        # One hash-index alignment over both factor frames instead of two
+        # sequential merges.
+        table = table.join(
+            [
+                adj_factors.set_index("ts_code")[["adj_factor"]],
+                prev_adj_factors.set_index("ts_code")[["adj_factor"]].rename(
+                    columns={"adj_factor": "prev_adj_factor"}
+                ),
+            ],
+            how="left",
+        )
+    table = table.reset_index()
+    close = table["close"].to_numpy(dtype="float64")
+    pre_close = table["pre_close"].to_numpy(dtype="float64")
+    if adj_factors is not None and prev_adj_factors is not None:
+        adj = pd.to_numeric(table["adj_factor"], errors="coerce").to_numpy(dtype="float64")
+        prev_adj = pd.to_numeric(table["prev_adj_factor"], errors="coerce").to_numpy(
+            dtype="float64"
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = close / pre_close * (adj / prev_adj) - 1.0
+        ret[~((adj > 0) & (prev_adj > 0))] = np.nan
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = close / pre_close - 1.0
+    table["ret"] = ret
+    return table[["ts_code", "close", "pre_close", "ret"]]
+
+
+def compute_equal_weight_returns_shared(
+    constituent_frames: list[pd.DataFrame],
+    daily_prices: pd.DataFrame,
+    adj_factors: pd.DataFrame | None = None,
+    prev_adj_factors: pd.DataFrame | None = None,
+) -> list[tuple[float, pd.DataFrame, IndexStats]]:
+    """Equal-weight returns for several constituent sets of one day.
+
+    The daily/adj merge and the per-code return vector are computed once
+    and shared, instead of being rebuilt per constituent set.
+    """
+    table = _daily_return_table(daily_prices, adj_factors, prev_adj_factors)
+    results: list[tuple[float, pd.DataFrame, IndexStats]] = []
+    for constituents in constituent_frames:
+        if constituents.empty:
+            results.append((0.0, constituents, IndexStats(0, 0, 0)))
+            continue
+        merged = constituents.merge(table, on="ts_code", how="left")
+        # ret is already NaN wherever prices or factors were unusable, so
+        # one mask yields the stats without materializing a dropna frame.
+        ret = merged["ret"].to_numpy(dtype="float64")
+        pre_close = merged["pre_close"].to_numpy(dtype="float64")
+        valid_mask = np.isfinite(ret) & (pre_close > 0)
+        total = len(merged)
+        priced = int(valid_mask.sum())
+        missing = total - priced
+        if priced == 0:
+            results.append((0.0, merged, IndexStats(total, 0, missing)))
+            continue
+        holdings = merged.iloc[np.flatnonzero(valid_mask)][
+            ["ts_code", "name", "keyword", "forced", "ret", "close", "pre_close"]
+        ].copy()
+        holdings.insert(4, "weight", 1.0 / priced)
+        results.append(
+            (float(ret[valid_mask].mean()), holdings, IndexStats(total, priced, missing))
+        )
+    return results
+
+
+def compute_equal_weight_return(
+    constituents: pd.DataFrame,
+    daily_prices: pd.DataFrame,
+    adj_factors: pd.DataFrame | None = None,
+    prev_adj_factors: pd.DataFrame | None = None,
+) -> tuple[float, pd.DataFrame, IndexStats]:
+    if constituents.empty:
+        return 0.0, constituents, IndexStats(0, 0, 0)
+
+    # Join all per-code frames in one hash-index alignment instead of
+    # sequential merges that each rebuild the constituents hash table.
+    frames = [daily_prices.set_index("ts_code")[["close", "pre_close"]]]
+    if adj_factors is not None and prev_adj_factors is not None:
+        frames.append(adj_factors.set_index("ts_code")[["adj_factor"]])
+        frames.append(
+            prev_adj_factors.set_index("ts_code")[["adj_factor"]].rename(
+                columns={"adj_factor": "prev_adj_factor"}
+            )
+        )
+    merged = constituents.set_index("ts_code").join(frames, how="left").reset_index()
+    # Fused numpy expressions over contiguous arrays replace the chained
+    # pandas column arithmetic and its intermediate Series.
+    close = merged["close"].to_numpy(dtype="float64")
+    pre_close = merged["pre_close"].to_numpy(dtype="float64")
+    if adj_factors is not None and prev_adj_factors is not None:
+        adj = pd.to_numeric(merged["adj_factor"], errors="coerce").to_numpy(dtype="float64")
+        prev_adj = pd.to_numeric(merged["prev_adj_factor"], errors="coerce").to_numpy(
+            dtype="float64"
+        )
+        if _numexpr is not None and len(merged) > _NUMEXPR_MIN_ROWS:
+            ret = _numexpr.evaluate("close / pre_close * (adj / prev_adj) - 1.0")
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ret = close / pre_close * (adj / prev_adj) - 1.0
+        valid_mask = np.isfinite(ret) & (pre_close > 0) & (adj > 0) & (prev_adj > 0)
+    else:
+        if _numexpr is not None and len(merged) > _NUMEXPR_MIN_ROWS:
+            ret = _numexpr.evaluate("close / pre_close - 1.0")
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ret = close / pre_close - 1.0
+        valid_mask = np.isfinite(ret) & (pre_close > 0)
+    merged["ret"] = ret
+
+    # Stats come straight off the mask; the holdings frame is only sliced
+    # once we know there is something to slice.
     total = len(merged)
-    priced = len(valid)
+    priced = int(valid_mask.sum())
     missing = total - priced
 
     if priced == 0:
         return 0.0, merged, IndexStats(total, 0, missing)
 
-    valid["weight"] = 1.0 / priced
-    index_return = float(valid["ret"].mean())
-
-    holdings = valid[
-        ["ts_code", "name", "keyword", "forced", "weight", "ret", "close", "pre_close"]
+    index_return = float(ret[valid_mask].mean())
+    holdings = merged.iloc[np.flatnonzero(valid_mask)][
+        ["ts_code", "name", "keyword", "forced", "ret", "close", "pre_close"]
     ].copy()
+    holdings.insert(4, "weight", 1.0 / priced)
     return index_return, holdings, IndexStats(total, priced, missing)
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Iterable
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+import pandas as pd
+
+try:
+    # Optional: a compiled automaton scans each name once regardless of
+    # keyword count; the sorted linear scan remains the fallback.
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
 
 from .config import Rules
 
 _TS_CODE_RE = re.compile(r"^\d{6}\.(SZ|SH|BJ)$")
 
 
-@dataclass(frozen=True)
-class MatchResult:
+# NamedTuple over a frozen dataclass: one of these is built per classified
+# ticker, and tuple construction skips the frozen __setattr__ guard.
+class MatchResult(NamedTuple):
     strict: bool
     extended: bool
     strict_keyword: str | None
@@ -31,18 +41,51 @@ def _sorted_keywords(keywords: Iterable[str]) -> list[str]:
     return sorted({kw.strip() for kw in keywords if kw.strip()}, key=len, reverse=True)
 
 
-def _match_keyword(name: str, keywords: list[str]) -> str | None:
+def _match_keyword(
+    name: str, keywords: list[str], name_chars: set[str] | None = None
+) -> str | None:
     for keyword in keywords:
+        # A keyword whose first character is absent from the name cannot
+        # match; the set probe is far cheaper than the substring scan.
+        if name_chars is not None and keyword[0] not in name_chars:
+            continue
         if keyword and keyword in name:
             return keyword
     return None
 
 
-def _hit_exclude_pattern(name: str, patterns: Iterable[str]) -> bool:
-    for pattern in patterns:
-        if pattern and pattern in name:
-            return True
-    return False
+def _build_automaton(keywords: list[str]):
+    if _ahocorasick is None or not keywords:
+        return None
+    automaton = _ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _match_keyword_automaton(name: str, automaton) -> str | None:
+    # One linear pass over the name; keep the longest hit to mirror
+    # _match_keyword's longest-keyword-first priority.
+    best: str | None = None
+    for _, keyword in automaton.iter(name):
+        if best is None or len(keyword) > len(best):
+            best = keyword
+    return best
+
+
+def _match_keyword_series(names: pd.Series, keywords: list[str]) -> pd.Series:
+    # Same priority as _match_keyword (longest keyword first), but each
+    # keyword is tested as one C-level substring kernel over all names.
+    matched = pd.Series(pd.NA, index=names.index, dtype="object")
+    unmatched = pd.Series(True, index=names.index)
+    for keyword in keywords:
+        if not unmatched.any():
+            break
+        hits = unmatched & names.str.contains(keyword, regex=False)
+        matched[hits] = keyword
+        unmatched &= ~hits
+    return matched
 
 
 class Matcher:
@@ -52,6 +95,17 @@ class Matcher:
         self._exclude_codes = _split_force_items(rules.force_exclude)
         self._strict_keywords = _sorted_keywords(rules.strict_keywords)
         self._extended_keywords = _sorted_keywords(rules.extended_keywords)
+        self._strict_automaton = _build_automaton(self._strict_keywords)
+        self._extended_automaton = _build_automaton(self._extended_keywords)
+        # Exclude patterns only decide membership, never attribution, so a
+        # single escaped alternation scans each name once instead of once
+        # per pattern.
+        patterns = [pattern for pattern in rules.exclude_patterns if pattern]
+        self._exclude_re = (
+            re.compile("|".join(re.escape(pattern) for pattern in patterns))
+            if patterns
+            else None
+        )
 
     def classify(self, ts_code: str, name: str) -> MatchResult:
         code = ts_code.upper()
@@ -63,11 +117,21 @@ class Matcher:
         if code in self._include_codes:
             return MatchResult(True, True, "forced", "forced", True)
 
-        if _hit_exclude_pattern(safe_name, self._rules.exclude_patterns):
+        if self._exclude_re is not None and self._exclude_re.search(safe_name):
             return MatchResult(False, False, None, None, False)
 
-        strict_keyword = _match_keyword(safe_name, self._strict_keywords)
-        extended_keyword = _match_keyword(safe_name, self._extended_keywords)
+        name_chars: set[str] | None = None
+        if self._strict_automaton is not None:
+            strict_keyword = _match_keyword_automaton(safe_name, self._strict_automaton)
+        else:
+            name_chars = set(safe_name)
+            strict_keyword = _match_keyword(safe_name, self._strict_keywords, name_chars)
+        if self._extended_automaton is not None:
+            extended_keyword = _match_keyword_automaton(safe_name, self._extended_automaton)
+        else:
+            if name_chars is None:
+                name_chars = set(safe_name)
+            extended_keyword = _match_keyword(safe_name, self._extended_keywords, name_chars)
 
         return MatchResult(
             strict=bool(strict_keyword),
@@ -77,6 +141,50 @@ class Matcher:
             forced=False,
         )
 
+    def classify_frame(self, ts_codes: pd.Series, names: pd.Series) -> pd.DataFrame:
+        """Vectorized classify over aligned code/name Series.
+
+        Mirrors classify row-for-row, but each rule runs as one pandas
+        string kernel instead of a per-row Python call.
+        """
+        codes = ts_codes.astype(str).str.upper()
+        safe_names = names.fillna("").astype(str)
+
+        excluded = codes.isin(self._exclude_codes)
+        included = codes.isin(self._include_codes) & ~excluded
+        if self._exclude_re is not None:
+            pattern_hit = safe_names.str.contains(self._exclude_re)
+        else:
+            pattern_hit = pd.Series(False, index=safe_names.index)
+        eligible = ~excluded & ~included & ~pattern_hit
+
+        strict_keyword = _match_keyword_series(safe_names, self._strict_keywords).where(eligible)
+        extended_keyword = _match_keyword_series(safe_names, self._extended_keywords).where(
+            eligible
+        )
+        strict_keyword = strict_keyword.mask(included, "forced")
+        extended_keyword = extended_keyword.mask(included, "forced")
+
+        return pd.DataFrame(
+            {
+                "ts_code": ts_codes,
+                "name": safe_names,
+                "strict_keyword": strict_keyword,
+                "extended_keyword": extended_keyword,
+                "strict": strict_keyword.notna(),
+                "extended": extended_keyword.notna(),
+                "forced": included,
+            }
+        )
+
+
+@lru_cache(maxsize=8)
+def _matcher_for(rules: Rules) -> Matcher:
+    # Rules is frozen (and therefore hashable), so loop callers of
+    # classify_stock reuse one compiled matcher per rule set instead of
+    # re-sorting keywords and rebuilding automatons every call.
+    return Matcher(rules)
+
 
 def classify_stock(ts_code: str, name: str, rules: Rules) -> MatchResult:
-    return Matcher(rules).classify(ts_code, name)
+    return _matcher_for(rules).classify(ts_code, name)
@@ -1,24 +1,112 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+try:  # Optional speedup: orjson serializes several times faster than json.
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 from .index import IndexStats
 
 
+def _dump_json(payload: dict, indent: bool = True) -> str:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(payload, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(payload, ensure_ascii=False, indent=2)
+    return json.dumps(payload, ensure_ascii=False)
+
+
 def _variant_slice(df: pd.DataFrame, variant: str) -> pd.DataFrame:
     if df.empty or "variant" not in df.columns:
         return df.iloc[0:0]
     return df[df["variant"] == variant]
 
 
+_NAV_COLUMNS = (
+    "date",
+    "zoo_strict_ret",
+    "zoo_extended_ret",
+    "hs300_ret",
+    "zoo_strict_nav",
+    "zoo_extended_nav",
+    "hs300_nav",
+)
+
+
 def load_nav(nav_path: Path) -> pd.DataFrame:
+    # The stat key invalidates the memo whenever the file changes, so the
+    # tail-append fast path and multi-date runs parse each version once.
     if not nav_path.exists():
         return pd.DataFrame()
-    return pd.read_csv(nav_path, dtype={"date": str})
+    stat = nav_path.stat()
+    return _load_nav_cached(str(nav_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=4)
+def _load_nav_cached(path_value: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    # Multithreaded C++ parse; the date column stays a string dtype so the
+    # lexicographic comparisons elsewhere keep working.
+    return pd.read_csv(path_value, dtype={"date": str}, engine="pyarrow")
+
+
+def _read_nav_tail(nav_path: Path) -> tuple[list[str], dict[str, str]] | None:
+    """Return (header, last row) of nav.csv without parsing the full file."""
+    if not nav_path.exists():
+        return None
+    # The fast path appends a raw line, so the file must end with a
+    # newline — a hand-edited file without one would get the new row glued
+    # onto the last; send that to the rewrite path instead.
+    with nav_path.open("rb") as raw:
+        if raw.seek(0, 2) == 0:
+            return None
+        raw.seek(-1, 2)
+        if raw.read(1) != b"\n":
+            return None
+    with nav_path.open("r", encoding="utf-8") as handle:
+        header_line = handle.readline().strip()
+        last_line = ""
+        for line in handle:
+            stripped = line.strip()
+            if stripped:
+                last_line = stripped
+    if not header_line or not last_line:
+        return None
+    header = header_line.split(",")
+    values = last_line.split(",")
+    if len(values) != len(header):
+        return None
+    return header, dict(zip(header, values))
+
+
+def _build_nav_row(
+    date: str,
+    strict_ret: float,
+    extended_ret: float,
+    hs300_ret: float,
+    prev_strict: float,
+    prev_extended: float,
+    prev_hs300: float,
+) -> dict:
+    returns = np.array([strict_ret, extended_ret, hs300_ret], dtype="float64")
+    prev_navs = np.array([prev_strict, prev_extended, prev_hs300], dtype="float64")
+    navs = prev_navs * (1.0 + returns)
+    return {
+        "date": date,
+        "zoo_strict_ret": strict_ret,
+        "zoo_extended_ret": extended_ret,
+        "hs300_ret": hs300_ret,
+        "zoo_strict_nav": float(navs[0]),
+        "zoo_extended_nav": float(navs[1]),
+        "hs300_nav": float(navs[2]),
+    }
 
 
 def update_nav(
@@ -28,6 +116,31 @@ def update_nav(
     extended_ret: float,
     hs300_ret: float,
 ) -> tuple[pd.DataFrame, pd.Series]:
+    # Fast path: the common daily case appends a strictly newer date, so a
+    # tail read plus one appended line replaces the O(N) read-modify-write.
+    tail = _read_nav_tail(nav_path)
+    if tail is not None:
+        header, last = tail
+        # Exact header match only: the appended line is built from the
+        # file's own columns, so an extra column must take the slow path.
+        if set(header) == set(_NAV_COLUMNS) and last["date"] < date:
+            row = _build_nav_row(
+                date,
+                strict_ret,
+                extended_ret,
+                hs300_ret,
+                float(last["zoo_strict_nav"]),
+                float(last["zoo_extended_nav"]),
+                float(last["hs300_nav"]),
+            )
+            line = ",".join(str(row[column]) for column in header)
+            with nav_path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+            nav_df = load_nav(nav_path)
+            latest = nav_df[nav_df["date"] == date].iloc[0]
+            return nav_df, latest
+
+    # Slow path: first run, re-run of an existing date, or unexpected header.
     nav_df = load_nav(nav_path)
     if not nav_df.empty:
         nav_df = nav_df[nav_df["date"] != date].copy()
@@ -37,74 +150,121 @@ def update_nav(
         prev_extended = 1.0
         prev_hs300 = 1.0
     else:
-        nav_df = nav_df.sort_values("date")
-        last = nav_df.iloc[-1]
-        prev_strict = float(last["zoo_strict_nav"])
-        prev_extended = float(last["zoo_extended_nav"])
-        prev_hs300 = float(last["hs300_nav"])
-
-    row = {
-        "date": date,
-        "zoo_strict_ret": strict_ret,
-        "zoo_extended_ret": extended_ret,
-        "hs300_ret": hs300_ret,
-        "zoo_strict_nav": prev_strict * (1 + strict_ret),
-        "zoo_extended_nav": prev_extended * (1 + extended_ret),
-        "hs300_nav": prev_hs300 * (1 + hs300_ret),
-    }
-
-    nav_df = pd.concat([nav_df, pd.DataFrame([row])], ignore_index=True)
-    nav_df = nav_df.sort_values("date")
+        # Every writer leaves nav.csv date-sorted, so the latest row is
+        # the tail; re-sorting here would be a wasted O(n log n) pass.
+        if not nav_df["date"].is_monotonic_increasing:
+            nav_df = nav_df.sort_values("date")
+        last_row = nav_df.iloc[-1]
+        prev_strict = float(last_row["zoo_strict_nav"])
+        prev_extended = float(last_row["zoo_extended_nav"])
+        prev_hs300 = float(last_row["hs300_nav"])
+
+    row = _build_nav_row(
+        date, strict_ret, extended_ret, hs300_ret, prev_strict, prev_extended, prev_hs300
+    )
+    if nav_df.empty:
+        nav_df = pd.DataFrame([row], columns=list(_NAV_COLUMNS))
+    else:
+        # Label assignment appends in place, skipping the full-frame copy
+        # and dtype re-inference a one-row concat would pay.
+        nav_df = nav_df.reset_index(drop=True)
+        nav_df.loc[len(nav_df)] = row
+        # Appending a newer date keeps the frame sorted; only a mid-history
+        # re-run (older date) needs the sort.
+        if nav_df["date"].iloc[-2] > date:
+            nav_df = nav_df.sort_values("date")
     nav_df.to_csv(nav_path, index=False)
     latest = nav_df[nav_df["date"] == date].iloc[0]
     return nav_df, latest
 
 
-def save_holdings(path: Path, strict_holdings: pd.DataFrame, extended_holdings: pd.DataFrame) -> pd.DataFrame:
-    strict = strict_holdings.copy()
-    strict["variant"] = "strict"
-    extended = extended_holdings.copy()
-    extended["variant"] = "extended"
+def _write_snapshot(path: Path, df: pd.DataFrame) -> None:
+    if path.suffix == ".parquet":
+        df.to_parquet(path, engine="pyarrow", compression="snappy", index=False)
+    else:
+        # Legacy CSV targets: pyarrow's writer formats cells in C++ across
+        # threads instead of pandas' per-cell Python formatting.
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), str(path))
+
+
+def load_snapshot(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    # Legacy CSV snapshots: the pyarrow parser is multi-threaded and avoids
+    # the C engine's per-cell object inference.
+    return pd.read_csv(path, usecols=columns, engine="pyarrow")
+
+
+def _combine_variants(strict: pd.DataFrame, extended: pd.DataFrame) -> pd.DataFrame:
+    # Concat the inputs as-is and stamp the variant column once on the
+    # result, instead of copying each frame just to label it first. The
+    # categorical dtype keeps downstream variant comparisons on integer
+    # codes and shrinks the serialized column.
     combined = pd.concat([strict, extended], ignore_index=True)
-    combined.to_csv(path, index=False)
+    combined["variant"] = pd.Categorical(
+        np.repeat(["strict", "extended"], [len(strict), len(extended)]),
+        categories=["strict", "extended"],
+    )
+    return combined
+
+
+def save_holdings(path: Path, strict_holdings: pd.DataFrame, extended_holdings: pd.DataFrame) -> pd.DataFrame:
+    combined = _combine_variants(strict_holdings, extended_holdings)
+    _write_snapshot(path, combined)
     return combined
 
 
 def save_constituents(
     path: Path, strict_constituents: pd.DataFrame, extended_constituents: pd.DataFrame
 ) -> pd.DataFrame:
-    strict = strict_constituents.copy()
-    strict["variant"] = "strict"
-    extended = extended_constituents.copy()
-    extended["variant"] = "extended"
-    combined = pd.concat([strict, extended], ignore_index=True)
-    combined.to_csv(path, index=False)
+    combined = _combine_variants(strict_constituents, extended_constituents)
+    _write_snapshot(path, combined)
     return combined
 
 
 def compute_changes(today: pd.DataFrame, previous: pd.DataFrame) -> dict:
-    def _variant_changes(variant: str) -> dict:
-        today_slice = _variant_slice(today, variant)
-        prev_slice = _variant_slice(previous, variant)
-        today_set = set(today_slice["ts_code"]) if "ts_code" in today_slice.columns else set()
-        prev_set = set(prev_slice["ts_code"]) if "ts_code" in prev_slice.columns else set()
-        new_codes = today_set - prev_set
-        removed_codes = prev_set - today_set
-
-        def _to_records(df: pd.DataFrame, codes: set[str]) -> list[dict]:
-            if not codes or "ts_code" not in df.columns or "name" not in df.columns:
-                return []
-            filtered = df[df["ts_code"].isin(codes)][["ts_code", "name"]]
-            return filtered.drop_duplicates().to_dict(orient="records")
+    if previous.empty:
+        # First run of a deployment: everything is new, skip the set diffs.
+        def _variant_all_new(variant: str) -> dict:
+            today_slice = _variant_slice(today, variant)
+            if not {"ts_code", "name"}.issubset(today_slice.columns):
+                return {"new_in": [], "removed": []}
+            records = today_slice[["ts_code", "name"]].drop_duplicates().to_dict(orient="records")
+            return {"new_in": records, "removed": []}
 
         return {
-            "new_in": _to_records(today, new_codes),
-            "removed": _to_records(previous, removed_codes),
+            "strict": _variant_all_new("strict"),
+            "extended": _variant_all_new("extended"),
         }
 
+    # One (variant, ts_code) index per frame and two Index.difference calls
+    # replace the per-variant python-set round trips.
+    def _pair_index(df: pd.DataFrame) -> pd.MultiIndex:
+        if {"variant", "ts_code"}.issubset(df.columns):
+            return pd.MultiIndex.from_frame(df[["variant", "ts_code"]].drop_duplicates())
+        return pd.MultiIndex.from_arrays([[], []], names=["variant", "ts_code"])
+
+    today_idx = _pair_index(today)
+    prev_idx = _pair_index(previous)
+    new_pairs = today_idx.difference(prev_idx)
+    removed_pairs = prev_idx.difference(today_idx)
+
+    def _to_records(df: pd.DataFrame, pairs: pd.MultiIndex, variant: str) -> list[dict]:
+        codes = pairs[pairs.get_level_values(0) == variant].get_level_values(1)
+        if codes.empty or not {"ts_code", "name"}.issubset(df.columns):
+            return []
+        filtered = df[df["ts_code"].isin(codes)][["ts_code", "name"]]
+        return filtered.drop_duplicates().to_dict(orient="records")
+
     return {
-        "strict": _variant_changes("strict"),
-        "extended": _variant_changes("extended"),
+        variant: {
+            "new_in": _to_records(today, new_pairs, variant),
+            "removed": _to_records(previous, removed_pairs, variant),
+        }
+        for variant in ("strict", "extended")
     }
 
 
@@ -113,11 +273,17 @@ def compute_suspected_noise(constituents: pd.DataFrame) -> dict:
         slice_df = _variant_slice(constituents, variant)
         if slice_df.empty or "keyword" not in slice_df.columns:
             return []
-        keyword = slice_df["keyword"].fillna("").astype(str)
-        mask = keyword.str.len() == 1
+        # Length test straight over the object array; astype(str) would
+        # materialize a full stringified copy just to measure it.
+        keywords = slice_df["keyword"].to_numpy()
+        mask = np.fromiter(
+            (isinstance(value, str) and len(value) == 1 for value in keywords),
+            dtype=bool,
+            count=len(keywords),
+        )
         if "forced" in slice_df.columns:
-            mask &= ~slice_df["forced"].fillna(False).astype(bool)
-        filtered = slice_df[mask]
+            mask &= ~slice_df["forced"].fillna(False).to_numpy(dtype=bool)
+        filtered = slice_df.iloc[np.flatnonzero(mask)]
         return (
             filtered[["ts_code", "name", "keyword"]]
             .drop_duplicates()
@@ -134,7 +300,7 @@ def save_changes(path: Path, date: str, changes: dict, suspected_noise: dict | N
     payload = {"date": date, "changes": changes}
     if suspected_noise is not None:
         payload["suspected_noise"] = suspected_noise
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_text(_dump_json(payload), encoding="utf-8")
 
 
 def generate_latest_json(
@@ -160,7 +326,7 @@ def generate_latest_json(
         "benchmark_code": benchmark_code,
         "benchmark_label": benchmark_label,
     }
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_text(_dump_json(payload), encoding="utf-8")
 
 
 def generate_badges(
@@ -185,7 +351,9 @@ def generate_badges(
             "color": color,
         }
         path = badges_dir / f"{name}.json"
-        path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        # Pre-encode and write bytes: skips the TextIOWrapper encode layer
+        # for each of the three badge files.
+        path.write_bytes(_dump_json(payload, indent=False).encode("utf-8"))
 
 
 def generate_chart(
@@ -194,15 +362,21 @@ def generate_chart(
     if nav_df.empty:
         return
 
-    nav_df = nav_df.sort_values("date").copy()
-    dates = pd.to_datetime(nav_df["date"], format="%Y%m%d")
+    nav_df = nav_df.sort_values("date")
+    # Hand plot() plain numpy arrays so matplotlib skips its Series
+    # unpacking/conversion for each of the three lines.
+    dates = pd.to_datetime(nav_df["date"], format="%Y%m%d").to_numpy()
 
     import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    ax.plot(dates, nav_df["zoo_strict_nav"], label="Zoo Strict", linewidth=1.6)
-    ax.plot(dates, nav_df["zoo_extended_nav"], label="Zoo Extended", linewidth=1.6)
-    ax.plot(dates, nav_df["hs300_nav"], label=benchmark_label, linewidth=1.6)
+    # The OO API keeps each call self-contained (no pyplot global state),
+    # so the chart can be rendered from a worker thread.
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    ax.plot(dates, nav_df["zoo_strict_nav"].to_numpy(), label="Zoo Strict", linewidth=1.6)
+    ax.plot(dates, nav_df["zoo_extended_nav"].to_numpy(), label="Zoo Extended", linewidth=1.6)
+    ax.plot(dates, nav_df["hs300_nav"].to_numpy(), label=benchmark_label, linewidth=1.6)
 
     locator = mdates.AutoDateLocator(minticks=6, maxticks=10)
     ax.xaxis.set_major_locator(locator)
@@ -215,7 +389,6 @@ def generate_chart(
     ax.grid(True, axis="y", linestyle="--", alpha=0.3)
     fig.tight_layout()
     fig.savefig(path, dpi=200)
-    plt.close(fig)
 
 
 def generate_index_html(
@@ -225,17 +398,26 @@ def generate_index_html(
     extended_stats: IndexStats,
     benchmark_label: str = "HS300 ETF",
 ) -> None:
-    payload = {
-        "date": latest["date"],
-        "zoo_strict_nav": f"{latest['zoo_strict_nav']:.4f}",
-        "zoo_extended_nav": f"{latest['zoo_extended_nav']:.4f}",
-        "hs300_nav": f"{latest['hs300_nav']:.4f}",
-        "zoo_strict_daily": f"{latest['zoo_strict_ret']:.2%}",
-        "zoo_extended_daily": f"{latest['zoo_extended_ret']:.2%}",
-        "hs300_daily": f"{latest['hs300_ret']:.2%}",
-    }
+    html = _INDEX_HTML_TEMPLATE.format(
+        date=latest["date"],
+        zoo_strict_nav=f"{latest['zoo_strict_nav']:.4f}",
+        zoo_extended_nav=f"{latest['zoo_extended_nav']:.4f}",
+        hs300_nav=f"{latest['hs300_nav']:.4f}",
+        zoo_strict_daily=f"{latest['zoo_strict_ret']:.2%}",
+        zoo_extended_daily=f"{latest['zoo_extended_ret']:.2%}",
+        hs300_daily=f"{latest['hs300_ret']:.2%}",
+        strict_priced=strict_stats.priced_constituents,
+        strict_total=strict_stats.total_constituents,
+        extended_priced=extended_stats.priced_constituents,
+        extended_total=extended_stats.total_constituents,
+        benchmark_label=benchmark_label,
+    )
+    path.write_text(html, encoding="utf-8")
+
 
-    html = f"""<!doctype html>
+# Parsed once at import; generate_index_html only pays for the format()
+# substitution per call.
+_INDEX_HTML_TEMPLATE = """<!doctype html>
 <html lang="zh-CN">
 <head>
   <meta charset="utf-8" />
@@ -322,26 +504,26 @@ def generate_index_html(
 <body>
   <header>
     <h1>A股动物园指数</h1>
-    <div class="subtitle">最近更新：{payload['date']}</div>
+    <div class="subtitle">最近更新：{date}</div>
   </header>
   <main>
     <section class="cards">
       <div class="card">
         <h3>严格动物园</h3>
-        <div class="stat">{payload['zoo_strict_nav']}</div>
-        <div class="stat"><small>今日涨跌</small> {payload['zoo_strict_daily']}</div>
-        <div class="stat"><small>成分股</small> {strict_stats.priced_constituents}/{strict_stats.total_constituents}</div>
+        <div class="stat">{zoo_strict_nav}</div>
+        <div class="stat"><small>今日涨跌</small> {zoo_strict_daily}</div>
+        <div class="stat"><small>成分股</small> {strict_priced}/{strict_total}</div>
       </div>
       <div class="card">
         <h3>扩展动物园</h3>
-        <div class="stat">{payload['zoo_extended_nav']}</div>
-        <div class="stat"><small>今日涨跌</small> {payload['zoo_extended_daily']}</div>
-        <div class="stat"><small>成分股</small> {extended_stats.priced_constituents}/{extended_stats.total_constituents}</div>
+        <div class="stat">{zoo_extended_nav}</div>
+        <div class="stat"><small>今日涨跌</small> {zoo_extended_daily}</div>
+        <div class="stat"><small>成分股</small> {extended_priced}/{extended_total}</div>
       </div>
       <div class="card">
         <h3>{benchmark_label}</h3>
-        <div class="stat">{payload['hs300_nav']}</div>
-        <div class="stat"><small>今日涨跌</small> {payload['hs300_daily']}</div>
+        <div class="stat">{hs300_nav}</div>
+        <div class="stat"><small>今日涨跌</small> {hs300_daily}</div>
       </div>
     </section>
     <section class="chart">
@@ -355,4 +537,3 @@ def generate_index_html(
 </body>
 </html>
 """
-    path.write_text(html, encoding="utf-8")
@@ -1,7 +1,11 @@
 import pandas as pd
 import pytest
 
-from zoo_index.index import compute_equal_weight_return
+from zoo_index.index import (
+    compute_equal_weight_return,
+    compute_equal_weight_returns_batch,
+    compute_equal_weight_returns_shared,
+)
 
 
 def test_compute_equal_weight_return_reweights_missing_prices() -> None:
@@ -55,3 +59,144 @@ def test_compute_equal_weight_return_uses_adj_factor() -> None:
 
     assert stats.priced_constituents == 1
     assert index_ret == pytest.approx(10.0 / 9.0 * 2.0 - 1)
+
+
+def test_compute_equal_weight_returns_shared_matches_single_day() -> None:
+    strict = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "name": "Alpha", "keyword": "CAT", "forced": False},
+        ]
+    )
+    extended = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "name": "Alpha", "keyword": "CAT", "forced": False},
+            {"ts_code": "000002.SZ", "name": "Beta", "keyword": "DOG", "forced": False},
+        ]
+    )
+    daily_prices = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "close": 10.0, "pre_close": 9.0},
+            {"ts_code": "000002.SZ", "close": 5.0, "pre_close": 4.0},
+        ]
+    )
+    adj_factors = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "adj_factor": 2.0},
+            {"ts_code": "000002.SZ", "adj_factor": 1.0},
+        ]
+    )
+    prev_adj_factors = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "adj_factor": 1.0},
+            {"ts_code": "000002.SZ", "adj_factor": 1.0},
+        ]
+    )
+
+    shared_results = compute_equal_weight_returns_shared(
+        [strict, extended], daily_prices, adj_factors, prev_adj_factors
+    )
+
+    for constituents, (shared_ret, shared_holdings, shared_stats) in zip(
+        (strict, extended), shared_results
+    ):
+        expected_ret, expected_holdings, expected_stats = compute_equal_weight_return(
+            constituents, daily_prices, adj_factors, prev_adj_factors
+        )
+        assert shared_ret == pytest.approx(expected_ret)
+        assert shared_stats == expected_stats
+        assert list(shared_holdings["ts_code"]) == list(expected_holdings["ts_code"])
+
+
+def test_compute_equal_weight_returns_batch_matches_single_day() -> None:
+    constituents = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "name": "Alpha", "keyword": "CAT", "forced": False},
+            {"ts_code": "000002.SZ", "name": "Beta", "keyword": "DOG", "forced": False},
+        ]
+    )
+    daily_by_date = {
+        "20240102": pd.DataFrame(
+            [
+                {"ts_code": "000001.SZ", "close": 10.0, "pre_close": 9.0},
+                {"ts_code": "000002.SZ", "close": 5.0, "pre_close": 4.0},
+            ]
+        ),
+        "20240103": pd.DataFrame(
+            [
+                {"ts_code": "000001.SZ", "close": 11.0, "pre_close": 10.0},
+                {"ts_code": "000002.SZ", "close": None, "pre_close": None},
+            ]
+        ),
+    }
+    adj_by_date = {
+        date: pd.DataFrame(
+            [
+                {"ts_code": "000001.SZ", "adj_factor": 1.0},
+                {"ts_code": "000002.SZ", "adj_factor": 1.0},
+            ]
+        )
+        for date in ("20231229", "20240102", "20240103")
+    }
+    prev_date_map = {"20240102": "20231229", "20240103": "20240102"}
+    dates = ["20240102", "20240103"]
+
+    results = compute_equal_weight_returns_batch(
+        constituents, daily_by_date, adj_by_date, prev_date_map, dates
+    )
+
+    for date in dates:
+        expected_ret, expected_holdings, expected_stats = compute_equal_weight_return(
+            constituents,
+            daily_by_date[date],
+            adj_by_date[date],
+            adj_by_date[prev_date_map[date]],
+        )
+        batch_ret, batch_holdings, batch_stats = results[date]
+        assert batch_ret == pytest.approx(expected_ret)
+        assert batch_stats == expected_stats
+        assert list(batch_holdings["ts_code"]) == list(expected_holdings["ts_code"])
+        assert batch_holdings["ret"].tolist() == pytest.approx(
+            expected_holdings["ret"].tolist()
+        )
+
+
+def test_numexpr_path_matches_numpy(monkeypatch) -> None:
+    pytest.importorskip("numexpr")
+    from zoo_index import index as index_module
+
+    constituents = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "name": "Alpha", "keyword": "CAT", "forced": False},
+            {"ts_code": "000002.SZ", "name": "Beta", "keyword": "DOG", "forced": False},
+        ]
+    )
+    daily_prices = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "close": 10.0, "pre_close": 9.0},
+            {"ts_code": "000002.SZ", "close": 21.0, "pre_close": 20.0},
+        ]
+    )
+    adj_factors = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "adj_factor": 2.0},
+            {"ts_code": "000002.SZ", "adj_factor": 1.0},
+        ]
+    )
+    prev_adj_factors = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "adj_factor": 1.0},
+            {"ts_code": "000002.SZ", "adj_factor": 1.0},
+        ]
+    )
+
+    plain_ret, _, plain_stats = compute_equal_weight_return(
+        constituents, daily_prices, adj_factors, prev_adj_factors
+    )
+    # Drop the size gate so the numexpr branch runs on this small frame.
+    monkeypatch.setattr(index_module, "_NUMEXPR_MIN_ROWS", 0)
+    fast_ret, _, fast_stats = compute_equal_weight_return(
+        constituents, daily_prices, adj_factors, prev_adj_factors
+    )
+
+    assert fast_ret == pytest.approx(plain_ret)
+    assert fast_stats == plain_stats
@@ -1,5 +1,14 @@
+import pandas as pd
+import pytest
+
 from zoo_index.config import Rules
-from zoo_index.matcher import Matcher
+from zoo_index.matcher import (
+    Matcher,
+    _build_automaton,
+    _match_keyword,
+    _match_keyword_automaton,
+    _sorted_keywords,
+)
 
 
 def _rules(**overrides) -> Rules:
@@ -32,3 +41,46 @@ def test_matcher_exclude_pattern_overrides_match() -> None:
 
     assert not result.strict
     assert not result.extended
+
+
+def test_automaton_matches_linear_scan() -> None:
+    pytest.importorskip("ahocorasick")
+    keywords = _sorted_keywords(("CATFISH", "CAT", "DOG", "犀牛", "牛"))
+    automaton = _build_automaton(keywords)
+    assert automaton is not None
+
+    names = ["ACME CATFISH LTD", "BIG CAT CO", "犀牛实业", "小牛电器", "PLAIN CO", ""]
+    for name in names:
+        assert _match_keyword_automaton(name, automaton) == _match_keyword(name, keywords)
+
+
+def test_classify_frame_matches_classify() -> None:
+    matcher = Matcher(
+        _rules(
+            exclude_patterns=("BAD",),
+            force_include=("000004.SZ",),
+            force_exclude=("000005.SZ",),
+        )
+    )
+    universe = pd.DataFrame(
+        [
+            {"ts_code": "000001.SZ", "name": "ACME CATFISH LTD"},
+            {"ts_code": "000002.SZ", "name": "BAD CATFISH LTD"},
+            {"ts_code": "000003.SZ", "name": "PLAIN CO"},
+            {"ts_code": "000004.SZ", "name": "FORCED IN"},
+            {"ts_code": "000005.SZ", "name": "CAT FORCED OUT"},
+            {"ts_code": "000006.SZ", "name": None},
+        ]
+    )
+
+    frame = matcher.classify_frame(universe["ts_code"], universe["name"])
+
+    for row, (_, result) in zip(universe.itertuples(index=False), frame.iterrows()):
+        name = row.name if isinstance(row.name, str) else ""
+        expected = matcher.classify(row.ts_code, name)
+        assert bool(result["strict"]) == expected.strict
+        assert bool(result["extended"]) == expected.extended
+        assert bool(result["forced"]) == expected.forced
+        assert (result["strict_keyword"] if pd.notna(result["strict_keyword"]) else None) == (
+            expected.strict_keyword
+        )
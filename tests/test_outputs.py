@@ -2,7 +2,13 @@ import json
 
 import pandas as pd
 
-from zoo_index.outputs import compute_changes, compute_suspected_noise, generate_badges
+from zoo_index.outputs import (
+    compute_changes,
+    compute_suspected_noise,
+    generate_badges,
+    load_nav,
+    update_nav,
+)
 
 
 def _code_set(records) -> set[str]:
@@ -77,6 +83,53 @@ def test_compute_suspected_noise_filters_single_keywords() -> None:
     assert _code_set(noise["extended"]) == {"000001.SZ"}
 
 
+def test_update_nav_appends_and_compounds(tmp_path) -> None:
+    nav_path = tmp_path / "nav.csv"
+
+    update_nav(nav_path, "20240101", 0.01, 0.02, 0.0)
+    nav_df, latest = update_nav(nav_path, "20240102", 0.01, 0.0, 0.01)
+
+    assert nav_df["date"].tolist() == ["20240101", "20240102"]
+    assert float(latest["zoo_strict_nav"]) == round(1.01 * 1.01, 10)
+    assert float(latest["hs300_nav"]) == 1.01
+
+
+def test_update_nav_rewrites_existing_date(tmp_path) -> None:
+    nav_path = tmp_path / "nav.csv"
+
+    update_nav(nav_path, "20240101", 0.01, 0.01, 0.0)
+    update_nav(nav_path, "20240102", 0.05, 0.05, 0.0)
+    nav_df, latest = update_nav(nav_path, "20240102", 0.01, 0.01, 0.0)
+
+    assert nav_df["date"].tolist() == ["20240101", "20240102"]
+    assert float(latest["zoo_strict_nav"]) == round(1.01 * 1.01, 10)
+
+
+def test_update_nav_missing_trailing_newline_takes_slow_path(tmp_path) -> None:
+    nav_path = tmp_path / "nav.csv"
+    update_nav(nav_path, "20240101", 0.01, 0.01, 0.0)
+    nav_path.write_text(nav_path.read_text(encoding="utf-8").rstrip("\n"), encoding="utf-8")
+
+    nav_df, latest = update_nav(nav_path, "20240102", 0.01, 0.01, 0.0)
+
+    assert nav_df["date"].tolist() == ["20240101", "20240102"]
+    assert load_nav(nav_path)["date"].tolist() == ["20240101", "20240102"]
+    assert float(latest["zoo_strict_nav"]) == round(1.01 * 1.01, 10)
+
+
+def test_update_nav_extra_column_takes_slow_path(tmp_path) -> None:
+    nav_path = tmp_path / "nav.csv"
+    update_nav(nav_path, "20240101", 0.01, 0.01, 0.0)
+    nav_df = load_nav(nav_path)
+    nav_df["note"] = "manual"
+    nav_df.to_csv(nav_path, index=False)
+
+    nav_df, latest = update_nav(nav_path, "20240102", 0.01, 0.01, 0.0)
+
+    assert nav_df["date"].tolist() == ["20240101", "20240102"]
+    assert float(latest["zoo_strict_nav"]) == round(1.01 * 1.01, 10)
+
+
 def test_generate_badges_writes_schema(tmp_path) -> None:
     latest = pd.Series(
         {